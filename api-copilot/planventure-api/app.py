@@ -3,23 +3,36 @@ from flask_cors import CORS
 from src.config import Config
 from src.models import db
 from src.models.init_db import register_commands
+from src.services.server import register_commands as register_server_commands
 from src.services.email_service import mail
+from src.services.profiler import init_profiler
+from src.services.compression import init_compression
+from src.services.rate_limiter import limiter
+from src.services.token_revocation import revocation_list
+from src.services.availability import availability_index
+from src.services.token_sweeper import start_sweeper
+from src.services.sharding import init_sharding, create_tables
 from src.routes.main import main
 from src.routes.users import users
 from src.routes.trips import trips
 from src.routes.auth import auth
 
-def create_app():
+def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
     
     # Initialize extensions
     CORS(app)
+    init_sharding(app)
     db.init_app(app)
     mail.init_app(app)
+    limiter.init_app(app)
+    init_compression(app)
+    init_profiler(app)
     
     # Register CLI commands
     register_commands(app)
+    register_server_commands(app)
     
     # Register blueprints
     app.register_blueprint(main)
@@ -27,9 +40,15 @@ def create_app():
     app.register_blueprint(trips)
     app.register_blueprint(auth, url_prefix='/auth')
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    # Create database tables, on every shard when sharded
+    create_tables(app)
+    
+    # Load revoked refresh tokens and taken usernames/emails into memory
+    revocation_list.init_app(app)
+    availability_index.init_app(app)
+    
+    # Optional in-process sweeping of expired tokens
+    start_sweeper(app)
     
     return app
 
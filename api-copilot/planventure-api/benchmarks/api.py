@@ -0,0 +1,241 @@
+"""
+Offline load test for the PlanVenture API hot paths.
+
+Runs each scenario against create_app() with a throwaway SQLite database
+and reports p50/p95/p99 latency and throughput. Results can be saved as a
+JSON baseline and later runs compared against it.
+
+Usage (from the planventure-api directory):
+    python -m benchmarks.api --concurrency 4 --requests 200
+    python -m benchmarks.api --save benchmarks/baselines/local.json
+    python -m benchmarks.api --compare benchmarks/baselines/local.json
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert
+
+from app import create_app
+from src.config import Config
+from src.models import db, User, Trip
+from src.models.user_utils import hash_password
+from src.services.jwt_manager import JWTManager
+from benchmarks.harness import run_concurrently, build_report, save_report, load_report, \
+    compare_reports, format_table
+
+BENCH_PASSWORD = 'benchmark-password'
+SCENARIOS = ['register', 'login', 'refresh_token', 'create_trip', 'my_trips', 'me']
+
+def make_config(database_path: str):
+    """Build a Config subclass pointing at a throwaway database."""
+    class BenchmarkConfig(Config):
+        TESTING = True
+        MAIL_SUPPRESS_SEND = True
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database_path}'
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}}
+        PROFILE_SAMPLE_RATE = 0.0
+        PROFILE_SLOW_REQUEST_MS = 0
+        PROFILE_HEADER_ENABLED = False
+        RATELIMIT_ENABLED = False  # The load comes from one client address
+    return BenchmarkConfig
+
+def seed_fixtures(app, users: int, trips_per_user: int) -> list:
+    """
+    Insert benchmark users and trips directly, bypassing the API.
+
+    Returns:
+        list: One dict per user with id, username, access and refresh tokens
+    """
+    password_hash, salt = hash_password(BENCH_PASSWORD)
+    now = datetime.now(timezone.utc)
+    with app.app_context():
+        db.session.execute(insert(User), [{
+            'username': f'bench_user_{i}',
+            'email': f'bench_user_{i}@example.com',
+            'password_hash': password_hash,
+            'password_salt': salt,
+            'email_verified': True,
+            'created_at': now,
+            'updated_at': now
+        } for i in range(users)])
+        seeded = User.query.filter(User.username.like('bench_user_%')).all()
+
+        trip_rows = []
+        for user in seeded:
+            for j in range(trips_per_user):
+                start = now + timedelta(days=j * 7)
+                trip_rows.append({
+                    'user_id': user.id,
+                    'title': f'Trip {j}',
+                    'destination': 'Paris, France',
+                    'latitude': 48.8566,
+                    'longitude': 2.3522,
+                    'start_date': start,
+                    'end_date': start + timedelta(days=3),
+                    'itinerary': {f'day{d}': {'morning': 'Museum', 'afternoon': 'Walk', 'evening': 'Dinner'}
+                                  for d in range(1, 4)},
+                    'created_at': now,
+                    'updated_at': now
+                })
+        if trip_rows:
+            db.session.execute(insert(Trip), trip_rows)
+        db.session.commit()
+
+        return [{
+            'id': user.id,
+            'username': user.username,
+            'access_token': JWTManager.generate_token(user),
+            'refresh_token': JWTManager.generate_refresh_token(user)
+        } for user in seeded]
+
+def scenario_workers(app, fixtures: list, trips_per_user: int) -> dict:
+    """Return a worker factory per scenario name."""
+    counter = itertools.count()
+    counter_lock = threading.Lock()
+
+    def next_id():
+        with counter_lock:
+            return next(counter)
+
+    def auth_headers(user):
+        return {'Authorization': f"Bearer {user['access_token']}"}
+
+    def register():
+        client = app.test_client()
+        def op():
+            n = next_id()
+            response = client.post('/auth/register', json={
+                'username': f'new_user_{n}',
+                'email': f'new_user_{n}@example.com',
+                'password': BENCH_PASSWORD
+            })
+            return response.status_code == 201
+        return op
+
+    def login():
+        client = app.test_client()
+        def op():
+            user = random.choice(fixtures)
+            response = client.post('/login', json={'username': user['username'], 'password': BENCH_PASSWORD})
+            return response.status_code == 200
+        return op
+
+    def refresh_token():
+        client = app.test_client()
+        # Each worker owns one user so rotated refresh tokens are never shared
+        user = dict(fixtures[next_id() % len(fixtures)])
+        def op():
+            response = client.post('/refresh-token', json={'refresh_token': user['refresh_token']})
+            if response.status_code != 200:
+                return False
+            user['refresh_token'] = response.get_json().get('refresh_token', user['refresh_token'])
+            return True
+        return op
+
+    def create_trip():
+        client = app.test_client()
+        def op():
+            user = random.choice(fixtures)
+            response = client.post('/trips', headers=auth_headers(user), json={
+                'title': 'Benchmark trip',
+                'destination': 'Tokyo, Japan',
+                'start_date': '2030-01-01',
+                'end_date': '2030-01-08',
+                'latitude': 35.6762,
+                'longitude': 139.6503,
+                'itinerary': {'day1': {'morning': 'Market', 'afternoon': 'Temple', 'evening': 'Crossing'}}
+            })
+            return response.status_code == 201
+        return op
+
+    def my_trips():
+        client = app.test_client()
+        pages = max(trips_per_user // 20, 1)
+        def op():
+            user = random.choice(fixtures)
+            page = random.randint(1, pages)
+            response = client.get(f'/my/trips?page={page}&per_page=20', headers=auth_headers(user))
+            return response.status_code == 200
+        return op
+
+    def me():
+        client = app.test_client()
+        def op():
+            response = client.get('/me', headers=auth_headers(random.choice(fixtures)))
+            return response.status_code == 200
+        return op
+
+    return {
+        'register': register,
+        'login': login,
+        'refresh_token': refresh_token,
+        'create_trip': create_trip,
+        'my_trips': my_trips,
+        'me': me
+    }
+
+def run(scenarios: list, requests: int, concurrency: int, users: int, trips_per_user: int) -> dict:
+    """Run the selected scenarios against a fresh app and database."""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(make_config(os.path.join(tmp, 'benchmark.db')))
+        fixtures = seed_fixtures(app, users, trips_per_user)
+        workers = scenario_workers(app, fixtures, trips_per_user)
+
+        results = {}
+        for name in scenarios:
+            results[name] = run_concurrently(workers[name], requests, concurrency)
+        with app.app_context():
+            db.engine.dispose()
+        return results
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the PlanVenture API hot paths.')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"Comma separated list from: {', '.join(SCENARIOS)}")
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent client threads')
+    parser.add_argument('--users', type=int, default=50, help='Seeded users')
+    parser.add_argument('--trips-per-user', type=int, default=100, help='Seeded trips per user')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for request mix')
+    parser.add_argument('--save', metavar='PATH', help='Write results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='Compare results against a JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed p95/throughput change before flagging a regression (fraction)')
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    random.seed(args.seed)
+    results = run(scenarios, args.requests, args.concurrency, args.users, args.trips_per_user)
+    report = build_report(results, {
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'users': args.users,
+        'trips_per_user': args.trips_per_user
+    })
+    print(format_table(results))
+
+    if args.save:
+        save_report(report, args.save)
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        regressions = compare_reports(load_report(args.compare), report, args.tolerance)
+        if regressions:
+            print(f"\nRegressions against {args.compare}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\nNo regressions against {args.compare}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Compare response compression codecs and levels on a /my/trips sized payload.
+
+Builds a page of synthetic trips (the same generator used by seed-db) and
+reports compressed size, ratio and compress/decompress latency for every
+installed codec at several levels.
+
+Usage (from the planventure-api directory):
+    python -m benchmarks.compression --trips 50 --rounds 50
+    python -m benchmarks.compression --save benchmarks/baselines/compression.json
+"""
+import argparse
+import json
+import sys
+import time
+import zlib
+
+from src.models.seed_data import generate_batch
+from src.services.compression import available_codecs, brotli, zstandard
+from benchmarks.harness import build_report, save_report
+
+LEVELS = {
+    'gzip': [1, 6, 9],
+    'br': [1, 4, 6, 11],
+    'zstd': [1, 3, 9, 19]
+}
+
+DECOMPRESSORS = {
+    'gzip': lambda data: zlib.decompress(data, 31),
+    'br': lambda data: brotli.decompress(data),
+    'zstd': lambda data: zstandard.ZstdDecompressor().decompress(data)
+}
+
+def build_payload(trips: int) -> bytes:
+    """Serialize a /my/trips response body holding the given number of trips."""
+    _, trip_rows = generate_batch(1, 1, trips, 'hash', 'salt', seed=1)
+    page = []
+    for i, row in enumerate(trip_rows, start=1):
+        page.append({
+            'id': i,
+            'user_id': row['user_id'],
+            'title': row['title'],
+            'destination': row['destination'],
+            'coordinates': {'latitude': row['latitude'], 'longitude': row['longitude']},
+            'start_date': row['start_date'].isoformat(),
+            'end_date': row['end_date'].isoformat(),
+            'itinerary': json.loads(row['itinerary_json']),
+            'created_at': row['created_at'].isoformat(),
+            'updated_at': row['updated_at'].isoformat()
+        })
+    body = {'trips': page, 'total': trips, 'pages': 1, 'current_page': 1, 'has_next': False, 'has_prev': False}
+    return json.dumps(body).encode()
+
+def time_ms(func, rounds: int) -> float:
+    """Return the median wall time of func in milliseconds."""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+def run(trips: int, rounds: int) -> dict:
+    payload = build_payload(trips)
+    results = {'identity': {'bytes': len(payload), 'ratio': 1.0, 'compress_ms': 0.0, 'decompress_ms': 0.0}}
+    for name, codec in available_codecs().items():
+        for level in LEVELS[name]:
+            body = codec.compress(payload, level)
+            results[f'{name}-{level}'] = {
+                'bytes': len(body),
+                'ratio': round(len(payload) / len(body), 2),
+                'compress_ms': round(time_ms(lambda: codec.compress(payload, level), rounds), 3),
+                'decompress_ms': round(time_ms(lambda: DECOMPRESSORS[name](body), rounds), 3)
+            }
+    return results
+
+def format_table(results: dict) -> str:
+    header = f"{'codec':<12}{'bytes':>10}{'ratio':>8}{'compress ms':>14}{'decompress ms':>16}"
+    lines = [header, '-' * len(header)]
+    for name, r in results.items():
+        lines.append(f"{name:<12}{r['bytes']:>10}{r['ratio']:>8.2f}{r['compress_ms']:>14.3f}{r['decompress_ms']:>16.3f}")
+    return '\n'.join(lines)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark response compression codecs and levels.')
+    parser.add_argument('--trips', type=int, default=50, help='Trips in the payload (per_page max is 50)')
+    parser.add_argument('--rounds', type=int, default=50, help='Timing rounds per codec and level')
+    parser.add_argument('--save', metavar='PATH', help='Write results as JSON')
+    args = parser.parse_args(argv)
+
+    results = run(args.trips, args.rounds)
+    print(f"Payload: {args.trips} trips, {results['identity']['bytes']} bytes\n")
+    print(format_table(results))
+
+    if args.save:
+        save_report(build_report(results, {'trips': args.trips, 'rounds': args.rounds}), args.save)
+        print(f"\nResults written to {args.save}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
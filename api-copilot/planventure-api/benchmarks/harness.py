@@ -0,0 +1,144 @@
+"""Timing, statistics and baseline helpers for the PlanVenture benchmarks."""
+import json
+import math
+import platform
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+def percentile(samples: list, pct: float) -> float:
+    """
+    Return the pct-th percentile of samples using nearest-rank.
+
+    Args:
+        samples: Sorted list of latencies
+        pct: Percentile between 0 and 100
+
+    Returns:
+        float: The percentile value, or 0.0 for an empty list
+    """
+    if not samples:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(samples)), 1)
+    return samples[rank - 1]
+
+def collect_latencies(worker_factory, total_requests: int, concurrency: int) -> tuple[list, int, float]:
+    """
+    Run total_requests operations spread over concurrency worker threads.
+
+    Args:
+        worker_factory: Callable returning a per-thread callable that performs
+            one request and returns True on success
+        total_requests: Number of operations to run in total
+        concurrency: Number of threads issuing requests in parallel
+
+    Returns:
+        tuple: (latencies in ms, error count, elapsed seconds)
+    """
+    per_worker = [total_requests // concurrency] * concurrency
+    for i in range(total_requests % concurrency):
+        per_worker[i] += 1
+
+    def work(count):
+        operation = worker_factory()
+        latencies, errors = [], 0
+        for _ in range(count):
+            start = time.perf_counter()
+            ok = operation()
+            latencies.append((time.perf_counter() - start) * 1000)
+            if not ok:
+                errors += 1
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(work, per_worker))
+    elapsed = time.perf_counter() - started
+
+    latencies = [l for worker_latencies, _ in results for l in worker_latencies]
+    errors = sum(worker_errors for _, worker_errors in results)
+    return latencies, errors, elapsed
+
+def summarize(latencies: list, errors: int, elapsed: float, concurrency: int) -> dict:
+    """Reduce raw latencies (ms) to percentiles, throughput and error count."""
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 3),
+        'req_per_s': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(latencies[-1], 3) if latencies else 0.0
+    }
+
+def run_concurrently(worker_factory, total_requests: int, concurrency: int) -> dict:
+    """
+    Run total_requests operations over concurrency threads and summarize them.
+
+    Returns:
+        dict: Latency percentiles (ms), throughput and error count
+    """
+    latencies, errors, elapsed = collect_latencies(worker_factory, total_requests, concurrency)
+    return summarize(latencies, errors, elapsed, concurrency)
+
+def build_report(results: dict, settings: dict) -> dict:
+    """Wrap scenario results with the metadata needed to compare runs."""
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': settings,
+        'results': results
+    }
+
+def save_report(report: dict, path: str) -> None:
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+def load_report(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def compare_reports(baseline: dict, current: dict, tolerance: float) -> list:
+    """
+    Compare a run against a baseline.
+
+    A scenario regresses when its p95 latency grows, or its throughput
+    drops, by more than tolerance (a fraction, e.g. 0.2 for 20%).
+
+    Returns:
+        list: Human readable regression messages, empty when none
+    """
+    regressions = []
+    for name, current_result in current['results'].items():
+        baseline_result = baseline['results'].get(name)
+        if not baseline_result:
+            continue
+        if current_result['errors'] > baseline_result['errors']:
+            regressions.append(
+                f"{name}: errors {baseline_result['errors']} -> {current_result['errors']}"
+            )
+        if baseline_result['p95_ms'] and \
+                current_result['p95_ms'] > baseline_result['p95_ms'] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {baseline_result['p95_ms']:.2f}ms -> {current_result['p95_ms']:.2f}ms"
+            )
+        if current_result['req_per_s'] < baseline_result['req_per_s'] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {baseline_result['req_per_s']:.1f} -> {current_result['req_per_s']:.1f} req/s"
+            )
+    return regressions
+
+def format_table(results: dict) -> str:
+    """Format scenario results as a fixed width table."""
+    header = f"{'scenario':<14}{'reqs':>7}{'errs':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    lines = [header, '-' * len(header)]
+    for name, r in results.items():
+        lines.append(
+            f"{name:<14}{r['requests']:>7}{r['errors']:>6}{r['req_per_s']:>10.1f}"
+            f"{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,125 @@
+"""
+Measure HTTP throughput of `flask serve` at different worker counts.
+
+Seeds a throwaway SQLite database, then for each worker count starts the
+prefork server on a local port and drives /me and /my/trips over
+keep-alive connections from several client processes.
+
+Usage (from the planventure-api directory):
+    python -m benchmarks.serve --workers 1,2,4 --threads 1 --requests 2000
+"""
+import argparse
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+from app import create_app
+from src.models import db
+from benchmarks.api import make_config, seed_fixtures
+from benchmarks.harness import collect_latencies, summarize, build_report, save_report
+
+PATHS = {
+    'me': '/me',
+    'my_trips': '/my/trips?page=1&per_page=20'
+}
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def wait_until_ready(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not start')
+
+def client_run(port: int, path: str, tokens: list, requests: int, threads: int) -> tuple[list, int, float]:
+    """Run one client process; each thread keeps one keep-alive connection."""
+    def worker_factory():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        def op():
+            headers = {'Authorization': f'Bearer {random.choice(tokens)}'}
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status == 200
+        return op
+    return collect_latencies(worker_factory, requests, threads)
+
+def run_server_benchmark(database_path: str, tokens: list, workers: int, threads: int,
+                         scenario: str, requests: int, clients: int, client_threads: int) -> dict:
+    port = free_port()
+    env = {
+        **os.environ,
+        'DATABASE_URL': f'sqlite:///{database_path}',
+        'RATELIMIT_ENABLED': 'false',
+        'TOKEN_SWEEP_INTERVAL': '0'
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'flask', '--app', 'app:create_app', 'serve',
+         '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--threads', str(threads)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(port)
+        per_client = requests // clients
+        with Pool(processes=clients) as pool:
+            runs = pool.starmap(client_run, [
+                (port, PATHS[scenario], tokens, per_client, client_threads) for _ in range(clients)
+            ])
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies = [l for run_latencies, _, _ in runs for l in run_latencies]
+    errors = sum(run_errors for _, run_errors, _ in runs)
+    elapsed = max(run_elapsed for _, _, run_elapsed in runs)
+    return summarize(latencies, errors, elapsed, clients * client_threads)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark flask serve throughput by worker count.')
+    parser.add_argument('--workers', default='1,2,4', help='Comma separated worker counts to try')
+    parser.add_argument('--threads', type=int, default=1, help='Threads per server worker')
+    parser.add_argument('--scenario', choices=sorted(PATHS), default='me')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per worker count')
+    parser.add_argument('--clients', type=int, default=2, help='Client processes')
+    parser.add_argument('--client-threads', type=int, default=8, help='Connections per client process')
+    parser.add_argument('--save', metavar='PATH', help='Write results as JSON')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_path = os.path.join(tmp, 'benchmark.db')
+        app = create_app(make_config(database_path))
+        tokens = [user['access_token'] for user in seed_fixtures(app, users=50, trips_per_user=40)]
+        with app.app_context():
+            db.engine.dispose()
+
+        results = {}
+        print(f"{'workers':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errs':>6}")
+        for workers in [int(w) for w in args.workers.split(',')]:
+            result = run_server_benchmark(database_path, tokens, workers, args.threads, args.scenario,
+                                          args.requests, args.clients, args.client_threads)
+            results[f'workers-{workers}'] = result
+            print(f"{workers:>8}{result['req_per_s']:>10.1f}{result['p50_ms']:>10.2f}"
+                  f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['errors']:>6}")
+
+    if args.save:
+        save_report(build_report(results, {**vars(args), 'cpu_count': os.cpu_count()}), args.save)
+        print(f"\nResults written to {args.save}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
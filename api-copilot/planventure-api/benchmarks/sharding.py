@@ -0,0 +1,132 @@
+"""
+Measure trip write throughput of `flask serve` at different shard counts.
+
+For each shard count, seeds throwaway SQLite databases (0 means one
+unsharded database), starts the prefork server with SHARD_DATABASE_URLS
+pointing at one file per shard and drives POST /trips from several client
+processes, each request writing as a random seeded user.
+
+Usage (from the planventure-api directory):
+    python -m benchmarks.sharding --shards 0,1,2,4 --workers 4 --requests 2000
+"""
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from multiprocessing import Pool
+
+from app import create_app
+from src.models import db, User
+from src.models.init_db import seed_bulk
+from src.services.jwt_manager import JWTManager
+from src.services.sharding import each_shard
+from benchmarks.api import make_config
+from benchmarks.serve import free_port, wait_until_ready
+from benchmarks.harness import collect_latencies, summarize, build_report, save_report
+
+TRIP = {
+    'title': 'Benchmark trip',
+    'destination': 'Lisbon, Portugal',
+    'start_date': '2026-05-01',
+    'end_date': '2026-05-04',
+    'itinerary': {'day1': {'morning': 'Alfama', 'afternoon': 'Tram 28', 'evening': 'Fado'}}
+}
+
+def shard_urls(directory: str, shards: int) -> list:
+    return [f"sqlite:///{os.path.join(directory, f'shard{shard}.db')}" for shard in range(shards)]
+
+def seed_databases(directory: str, shards: int, users: int) -> list:
+    """Create the databases for one shard count and return access tokens."""
+    config = make_config(os.path.join(directory, 'main.db'))
+    config.SHARD_DATABASE_URLS = shard_urls(directory, shards)
+    app = create_app(config)
+    with app.app_context():
+        with contextlib.redirect_stdout(io.StringIO()):
+            seed_bulk(users, trips_per_user=0, workers=1)
+        tokens = []
+        for _ in each_shard():
+            tokens.extend(JWTManager.generate_token(user) for user in User.query.all())
+        for engine in db.engines.values():
+            engine.dispose()
+    return tokens
+
+def client_run(port: int, tokens: list, requests: int, threads: int) -> tuple[list, int, float]:
+    """Run one client process; each thread keeps one keep-alive connection."""
+    body = json.dumps(TRIP)
+    def worker_factory():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        def op():
+            headers = {'Authorization': f'Bearer {random.choice(tokens)}', 'Content-Type': 'application/json'}
+            connection.request('POST', '/trips', body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status == 201
+        return op
+    return collect_latencies(worker_factory, requests, threads)
+
+def run_shard_benchmark(directory: str, shards: int, tokens: list, workers: int,
+                        requests: int, clients: int, client_threads: int) -> dict:
+    port = free_port()
+    env = {
+        **os.environ,
+        'DATABASE_URL': f"sqlite:///{os.path.join(directory, 'main.db')}",
+        'SHARD_DATABASE_URLS': ','.join(shard_urls(directory, shards)),
+        'RATELIMIT_ENABLED': 'false',
+        'TOKEN_SWEEP_INTERVAL': '0'
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'flask', '--app', 'app:create_app', 'serve',
+         '--bind', f'127.0.0.1:{port}', '--workers', str(workers)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(port)
+        per_client = requests // clients
+        with Pool(processes=clients) as pool:
+            runs = pool.starmap(client_run, [
+                (port, tokens, per_client, client_threads) for _ in range(clients)
+            ])
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies = [l for run_latencies, _, _ in runs for l in run_latencies]
+    errors = sum(run_errors for _, run_errors, _ in runs)
+    elapsed = max(run_elapsed for _, _, run_elapsed in runs)
+    return summarize(latencies, errors, elapsed, clients * client_threads)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark trip write throughput by shard count.')
+    parser.add_argument('--shards', default='0,1,2,4', help='Comma separated shard counts (0 = unsharded)')
+    parser.add_argument('--workers', type=int, default=4, help='Server worker processes')
+    parser.add_argument('--users', type=int, default=200, help='Seeded users spread over the shards')
+    parser.add_argument('--requests', type=int, default=2000, help='Trip writes per shard count')
+    parser.add_argument('--clients', type=int, default=2, help='Client processes')
+    parser.add_argument('--client-threads', type=int, default=8, help='Connections per client process')
+    parser.add_argument('--save', metavar='PATH', help='Write results as JSON')
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'shards':>8}{'writes/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errs':>6}")
+    for shards in [int(s) for s in args.shards.split(',')]:
+        with tempfile.TemporaryDirectory() as tmp:
+            tokens = seed_databases(tmp, shards, args.users)
+            result = run_shard_benchmark(tmp, shards, tokens, args.workers, args.requests,
+                                         args.clients, args.client_threads)
+        results[f'shards-{shards}'] = result
+        print(f"{shards:>8}{result['req_per_s']:>10.1f}{result['p50_ms']:>10.2f}"
+              f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['errors']:>6}")
+
+    if args.save:
+        save_report(build_report(results, {**vars(args), 'cpu_count': os.cpu_count()}), args.save)
+        print(f"\nResults written to {args.save}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
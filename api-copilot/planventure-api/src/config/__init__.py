@@ -25,3 +25,63 @@ class Config:
     # Application settings
     FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
     EMAIL_VERIFICATION_TIMEOUT = int(os.getenv('EMAIL_VERIFICATION_TIMEOUT', 86400))  # 24 hours
+    
+    # Profiling settings
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0.0))  # Fraction of requests to profile (0 disables)
+    PROFILE_SLOW_REQUEST_MS = int(os.getenv('PROFILE_SLOW_REQUEST_MS', 0))  # Capture requests slower than this (0 disables)
+    PROFILE_HEADER_ENABLED = os.getenv('PROFILE_HEADER_ENABLED', 'false').lower() == 'true'  # Allow signed X-Profile-Signature header
+    PROFILE_SIGNATURE_TTL = int(os.getenv('PROFILE_SIGNATURE_TTL', 300))  # Longest accepted lifetime of a profile signature, in seconds
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+    PROFILE_MAX_CAPTURES = int(os.getenv('PROFILE_MAX_CAPTURES', 100))  # Oldest captures are rotated out
+    
+    # Rate limiting for credential endpoints (login, registration, verification emails)
+    RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_IP_CAPACITY = int(os.getenv('RATELIMIT_IP_CAPACITY', 20))  # Burst size per client IP
+    RATELIMIT_IP_REFILL_PER_SEC = float(os.getenv('RATELIMIT_IP_REFILL_PER_SEC', 0.2))  # 12 per minute
+    RATELIMIT_IDENTITY_CAPACITY = int(os.getenv('RATELIMIT_IDENTITY_CAPACITY', 5))  # Burst size per username/email
+    RATELIMIT_IDENTITY_REFILL_PER_SEC = float(os.getenv('RATELIMIT_IDENTITY_REFILL_PER_SEC', 0.05))  # 3 per minute
+    RATELIMIT_AVAILABILITY_CAPACITY = int(os.getenv('RATELIMIT_AVAILABILITY_CAPACITY', 60))  # Per-IP burst for check-availability (queried per keystroke)
+    RATELIMIT_AVAILABILITY_REFILL_PER_SEC = float(os.getenv('RATELIMIT_AVAILABILITY_REFILL_PER_SEC', 2))  # 120 per minute
+    RATELIMIT_MAX_KEYS = int(os.getenv('RATELIMIT_MAX_KEYS', 100000))  # Bound on in-process buckets
+    RATELIMIT_STORAGE_URL = os.getenv('RATELIMIT_STORAGE_URL')  # e.g. redis://localhost:6379/0 to share buckets
+    
+    # Refresh token revocation
+    REVOCATION_FILTER_CAPACITY = int(os.getenv('REVOCATION_FILTER_CAPACITY', 1000000))  # Expected revoked tokens
+    REVOCATION_FILTER_ERROR_RATE = float(os.getenv('REVOCATION_FILTER_ERROR_RATE', 0.001))  # False positives cost one DB lookup
+    
+    # Username/email availability index
+    AVAILABILITY_FILTER_CAPACITY = int(os.getenv('AVAILABILITY_FILTER_CAPACITY', 1000000))  # Expected usernames + emails
+    AVAILABILITY_FILTER_ERROR_RATE = float(os.getenv('AVAILABILITY_FILTER_ERROR_RATE', 0.001))  # False positives cost one DB lookup
+    
+    # Expired token sweeping
+    UNVERIFIED_USER_TTL = int(os.getenv('UNVERIFIED_USER_TTL', 604800))  # Delete never-verified accounts after 7 days
+    TOKEN_SWEEP_BATCH_SIZE = int(os.getenv('TOKEN_SWEEP_BATCH_SIZE', 1000))  # Rows per transaction
+    TOKEN_SWEEP_INTERVAL = int(os.getenv('TOKEN_SWEEP_INTERVAL', 0))  # Seconds between in-process sweeps (0 disables)
+    
+    # Response compression
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_ALGORITHMS = os.getenv('COMPRESS_ALGORITHMS', 'br,zstd,gzip')  # Server preference order
+    COMPRESS_MIMETYPES = os.getenv('COMPRESS_MIMETYPES', 'application/json,text/html,text/plain,text/csv')
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # Bytes; smaller bodies are sent as-is
+    COMPRESS_LEVEL_GZIP = int(os.getenv('COMPRESS_LEVEL_GZIP', 6))
+    COMPRESS_LEVEL_BR = int(os.getenv('COMPRESS_LEVEL_BR', 4))
+    COMPRESS_LEVEL_ZSTD = int(os.getenv('COMPRESS_LEVEL_ZSTD', 3))
+    COMPRESS_CACHE_SIZE = int(os.getenv('COMPRESS_CACHE_SIZE', 512))  # Compressed bodies cached by ETag
+    
+    # Production server (flask serve)
+    SERVE_BIND = os.getenv('SERVE_BIND', '127.0.0.1:8000')
+    SERVE_WORKERS = int(os.getenv('SERVE_WORKERS', 0))  # 0 sizes from CPU count (2 x cores + 1)
+    SERVE_THREADS = int(os.getenv('SERVE_THREADS', 1))  # >1 switches to the threaded gthread worker
+    SERVE_KEEPALIVE = int(os.getenv('SERVE_KEEPALIVE', 5))  # Seconds; raise when behind a keep-alive proxy
+    SERVE_TIMEOUT = int(os.getenv('SERVE_TIMEOUT', 30))
+    SERVE_GRACEFUL_TIMEOUT = int(os.getenv('SERVE_GRACEFUL_TIMEOUT', 30))
+    SERVE_MAX_REQUESTS = int(os.getenv('SERVE_MAX_REQUESTS', 0))  # Recycle workers after N requests (0 disables)
+    SERVE_MAX_REQUESTS_JITTER = int(os.getenv('SERVE_MAX_REQUESTS_JITTER', 0))
+    
+    # Trip change feed
+    TRIP_CHANGES_PAGE_SIZE = int(os.getenv('TRIP_CHANGES_PAGE_SIZE', 100))  # Default and max 5x per request
+    TRIP_DELETION_RETENTION = int(os.getenv('TRIP_DELETION_RETENTION', 2592000))  # Keep tombstones 30 days
+    
+    # User sharding
+    SHARD_DATABASE_URLS = os.getenv('SHARD_DATABASE_URLS', '')  # Comma separated; empty keeps users in DATABASE_URL
+    SHARD_ID_BLOCK_SIZE = int(os.getenv('SHARD_ID_BLOCK_SIZE', 100))  # Trip ids reserved per main database write
\ No newline at end of file
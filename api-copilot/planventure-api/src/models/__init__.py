@@ -1,11 +1,17 @@
 from datetime import datetime, timezone
 from flask_sqlalchemy import SQLAlchemy
 from .user_utils import hash_password, verify_password
+from .shard_router import ShardedSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': ShardedSession})
 
 # Import models after db initialization to avoid circular imports
 from .trip import Trip
+from .revoked_token import RevokedToken
+from .trip_deletion import TripDeletion
+from .trip_change_counter import TripChangeCounter
+from .trip_stats import UserTripStats
+from .directory import UserDirectory, IdSequence, ShardLayout
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+from src.models import db
+
+class UserDirectory(db.Model):
+    """
+    Global user index kept in the main database when users are sharded.
+
+    Its autoincrement id is the user's id on every shard, and its unique
+    columns enforce username/email uniqueness across shards.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<UserDirectory {self.username}>'
+
+class IdSequence(db.Model):
+    """Next free id of a sharded table whose ids must be unique across shards."""
+    name = db.Column(db.String(50), primary_key=True)
+    next_id = db.Column(db.Integer, nullable=False)
+
+class ShardLayout(db.Model):
+    """The shard count the data is currently partitioned for (a single row)."""
+    id = db.Column(db.Integer, primary_key=True)
+    shard_count = db.Column(db.Integer, nullable=False)
+    resharded_at = db.Column(db.DateTime)  # Change feed cursors issued earlier are rejected
@@ -1,9 +1,22 @@
 """Database initialization script for PlanVenture API."""
 from datetime import datetime, timedelta, timezone
+from multiprocessing import Pool
+import os
+import time
 import click
+from flask import current_app
 from flask.cli import with_appcontext
+from sqlalchemy import bindparam, func
 from src.models import db, User
 from src.models.trip import Trip
+from src.models.user_utils import hash_password
+from src.models.seed_data import generate_batch, generate_batch_args
+from src.services.token_revocation import revocation_list
+from src.services.token_sweeper import sweep_tokens
+from src.services.trip_stats import rebuild_stats
+from src.services.sharding import add_user, drop_tables, create_tables, sharding_enabled, \
+    user_directory, insert_rows, allocate_ids, parse_shard_urls, reshard, sync_id_sequence
+from src.models.directory import UserDirectory
 
 # Initialize the database and create tables if they don't exist.
 # This command can be run from the command line using Flask CLI.
@@ -11,8 +24,8 @@ from src.models.trip import Trip
 
 def init_db():
     """Initialize the database."""
-    db.drop_all()
-    db.create_all()
+    drop_tables()
+    create_tables(current_app)
     print("Database tables created successfully!")
 
 def seed_db():
@@ -25,13 +38,14 @@ def seed_db():
         created_at=datetime.now(timezone.utc)
     )
     test_user.set_password("password123")
-    db.session.add(test_user)
+    add_user(test_user)
+    db.session.commit()
     
     # Create some sample trips
     current_time = datetime.now(timezone.utc)
     trips = [
         Trip(
-            user_id=1,  # Will be assigned to test_user
+            user_id=test_user.id,
             title="Weekend in Paris",
             destination="Paris, France",
             latitude=48.8566,
@@ -52,7 +66,7 @@ def seed_db():
             }
         ),
         Trip(
-            user_id=1,  # Will be assigned to test_user
+            user_id=test_user.id,
             title="Tokyo Adventure",
             destination="Tokyo, Japan",
             latitude=35.6762,
@@ -78,6 +92,75 @@ def seed_db():
     db.session.commit()
     print("Database seeded successfully!")
 
+def seed_bulk(users: int, trips_per_user: int, password: str = "password123",
+              batch_size: int = 10000, workers: int = None, seed: int = 1):
+    """
+    Seed the database with synthetic users and trips using bulk inserts.
+
+    Rows are generated in worker processes and inserted in batches of
+    roughly batch_size rows, committing after each batch. All users share
+    one precomputed password hash instead of hashing per user.
+
+    Args:
+        users: Number of users to create
+        trips_per_user: Number of trips to create for each user
+        password: Password set for every generated user
+        batch_size: Approximate number of rows per INSERT batch
+        workers: Number of generator processes (defaults to CPU count)
+        seed: Random seed for reproducible data
+    """
+    workers = workers or os.cpu_count() or 1
+    password_hash, salt = hash_password(password)
+    first_user_id = (db.session.query(func.max(user_directory().id)).scalar() or 0) + 1
+    users_per_batch = max(batch_size // max(trips_per_user + 1, 1), 1)
+
+    tasks = [
+        (first_user_id + start, min(users_per_batch, users - start), trips_per_user, password_hash, salt, seed)
+        for start in range(0, users, users_per_batch)
+    ]
+
+    # Itineraries arrive pre-encoded from the generator processes
+    trip_insert = Trip.__table__.insert().values(itinerary=bindparam('itinerary_json', type_=db.Text))
+
+    started = time.perf_counter()
+    users_inserted = trips_inserted = 0
+
+    def insert_batch(user_rows, trip_rows):
+        nonlocal users_inserted, trips_inserted
+        if sharding_enabled():
+            # Give trips ids unique across shards, then claim the users in the directory
+            first_trip_id = allocate_ids('trip', len(trip_rows)) if trip_rows else 0
+            for offset, row in enumerate(trip_rows):
+                row['id'] = first_trip_id + offset
+            db.session.execute(UserDirectory.__table__.insert(), [
+                {'id': row['id'], 'username': row['username'], 'email': row['email']} for row in user_rows
+            ])
+        insert_rows(User.__table__, user_rows)
+        if trip_rows:
+            insert_rows(Trip.__table__, trip_rows, trip_insert)
+        db.session.commit()
+        users_inserted += len(user_rows)
+        trips_inserted += len(trip_rows)
+        elapsed = time.perf_counter() - started
+        print(f"  {users_inserted}/{users} users, {trips_inserted} trips "
+              f"({trips_inserted / elapsed:.0f} trips/s)")
+
+    if workers > 1 and len(tasks) > 1:
+        with Pool(processes=workers) as pool:
+            for user_rows, trip_rows in pool.imap(generate_batch_args, tasks):
+                insert_batch(user_rows, trip_rows)
+    else:
+        for task in tasks:
+            insert_batch(*generate_batch(*task))
+
+    # User ids were assigned here rather than by the database
+    sync_id_sequence(db.session.connection(), user_directory().__table__)
+    db.session.commit()
+
+    elapsed = time.perf_counter() - started
+    print(f"Seeded {users_inserted} users and {trips_inserted} trips in {elapsed:.1f}s "
+          f"({users_inserted / elapsed:.0f} users/s, {trips_inserted / elapsed:.0f} trips/s)")
+
 @click.command('init-db')
 @with_appcontext
 def init_db_command():
@@ -85,12 +168,83 @@ def init_db_command():
     init_db()
 
 @click.command('seed-db')
+@click.option('--users', type=int, default=None, help='Generate this many synthetic users.')
+@click.option('--trips-per-user', type=int, default=5, show_default=True, help='Trips per synthetic user.')
+@click.option('--batch-size', type=int, default=10000, show_default=True, help='Rows per bulk insert.')
+@click.option('--workers', type=int, default=None, help='Generator processes [default: CPU count].')
+@click.option('--seed', type=int, default=1, show_default=True, help='Random seed.')
+@with_appcontext
+def seed_db_command(users, trips_per_user, batch_size, workers, seed):
+    """Seed the database with sample data, or bulk synthetic data with --users."""
+    if users is None:
+        seed_db()
+    else:
+        seed_bulk(users, trips_per_user, batch_size=batch_size, workers=workers, seed=seed)
+    # Seeding bypasses the per-request stats updates
+    rebuild_stats()
+
+@click.command('rebuild-stats')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help='Users written per commit.')
+@with_appcontext
+def rebuild_stats_command(batch_size):
+    """Recompute every user's trip statistics from the trip table.
+
+    Run once after deploying the trip statistics table, with the API
+    stopped: until then trip writes count existing users from zero.
+    """
+    started = time.perf_counter()
+    users = rebuild_stats(batch_size)
+    print(f"Rebuilt trip statistics for {users} users in {time.perf_counter() - started:.1f}s")
+
+@click.command('sweep-revoked-tokens')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help='Rows deleted per commit.')
 @with_appcontext
-def seed_db_command():
-    """Seed the database with sample data."""
-    seed_db()
+def sweep_revoked_tokens_command(batch_size):
+    """Delete revoked refresh tokens that have expired."""
+    started = time.perf_counter()
+    deleted = revocation_list.sweep_expired(batch_size)
+    print(f"Swept {deleted} expired revoked tokens in {time.perf_counter() - started:.1f}s")
+
+@click.command('sweep-tokens')
+@click.option('--batch-size', type=int, default=None, help='Rows per commit [default: TOKEN_SWEEP_BATCH_SIZE].')
+@with_appcontext
+def sweep_tokens_command(batch_size):
+    """Clear expired tokens, stale unverified users and old trip tombstones."""
+    results = sweep_tokens(current_app, batch_size)
+    print(f"Removed {results['unverified_users']} unverified users, "
+          f"cleared {results['verification_tokens']} verification tokens and "
+          f"{results['reset_tokens']} reset tokens, "
+          f"deleted {results['revoked_refresh_tokens']} expired revoked tokens and "
+          f"{results['trip_tombstones']} old trip tombstones")
+    print(f"Swept {results['total']} rows in {results['elapsed_s']}s ({results['rows_per_s']} rows/s)")
+
+@click.command('reshard')
+@click.option('--to', 'target_urls', required=True,
+              help='Comma separated database URLs of the new shards, in shard order.')
+@click.option('--batch-size', type=int, default=5000, show_default=True, help='Rows copied per batch.')
+@with_appcontext
+def reshard_command(target_urls, batch_size):
+    """Copy users and their data onto a new set of shard databases.
+
+    Run with the API stopped and the current SHARD_DATABASE_URLS (empty when
+    not yet sharded). The current databases are left as they are; restart
+    with SHARD_DATABASE_URLS set to the new URLs afterwards.
+    """
+    urls = parse_shard_urls(target_urls)
+    try:
+        copied = reshard(current_app, urls, batch_size)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    print(f"Copied {copied['user']} users, {copied['trip']} trips, "
+          f"{copied['revoked_token']} revoked tokens, {copied['trip_deletion']} trip tombstones and "
+          f"{copied['user_trip_stats']} trip summaries to {len(urls)} shards in {copied['elapsed_s']}s")
+    print(f"Now restart with SHARD_DATABASE_URLS={','.join(urls)}")
 
 def register_commands(app):
     """Register database commands."""
     app.cli.add_command(init_db_command)
     app.cli.add_command(seed_db_command)
+    app.cli.add_command(sweep_revoked_tokens_command)
+    app.cli.add_command(sweep_tokens_command)
+    app.cli.add_command(rebuild_stats_command)
+    app.cli.add_command(reshard_command)
@@ -0,0 +1,12 @@
+from datetime import datetime, timezone
+from src.models import db
+
+class RevokedToken(db.Model):
+    """A refresh token that has been rotated or revoked, keyed by its jti."""
+    jti = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)  # Row can be swept after this
+    revoked_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
@@ -0,0 +1,111 @@
+"""Synthetic data generation for seeding large PlanVenture databases."""
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+FIRST_NAMES = [
+    'olivia', 'liam', 'emma', 'noah', 'amelia', 'oliver', 'sophia', 'elijah', 'mia', 'lucas',
+    'aria', 'mateo', 'sara', 'ali', 'yuki', 'chen', 'priya', 'diego', 'fatima', 'ivan'
+]
+LAST_NAMES = [
+    'smith', 'garcia', 'kim', 'nguyen', 'muller', 'rossi', 'tanaka', 'silva', 'ahmadi', 'kowalski',
+    'dubois', 'jensen', 'patel', 'cohen', 'okafor', 'larsen', 'moreau', 'novak', 'costa', 'wang'
+]
+EMAIL_DOMAINS = ['example.com', 'example.org', 'example.net']
+
+# (destination, latitude, longitude)
+DESTINATIONS = [
+    ('Paris, France', 48.8566, 2.3522),
+    ('Tokyo, Japan', 35.6762, 139.6503),
+    ('New York, USA', 40.7128, -74.0060),
+    ('London, United Kingdom', 51.5074, -0.1278),
+    ('Rome, Italy', 41.9028, 12.4964),
+    ('Barcelona, Spain', 41.3874, 2.1686),
+    ('Istanbul, Turkey', 41.0082, 28.9784),
+    ('Bangkok, Thailand', 13.7563, 100.5018),
+    ('Sydney, Australia', -33.8688, 151.2093),
+    ('Cape Town, South Africa', -33.9249, 18.4241),
+    ('Rio de Janeiro, Brazil', -22.9068, -43.1729),
+    ('Mexico City, Mexico', 19.4326, -99.1332),
+    ('Reykjavik, Iceland', 64.1466, -21.9426),
+    ('Marrakesh, Morocco', 31.6295, -7.9811),
+    ('Kyoto, Japan', 35.0116, 135.7681),
+    ('Vancouver, Canada', 49.2827, -123.1207),
+    ('Lisbon, Portugal', 38.7223, -9.1393),
+    ('Prague, Czech Republic', 50.0755, 14.4378),
+    ('Dubai, UAE', 25.2048, 55.2708),
+    ('Bali, Indonesia', -8.3405, 115.0920)
+]
+TRIP_STYLES = ['Weekend in', 'Exploring', 'Food tour of', 'Family trip to', 'Backpacking', 'Honeymoon in']
+ACTIVITIES = {
+    'morning': ['Museum visit', 'Walking tour', 'Local market', 'Hike', 'Cooking class', 'Old town'],
+    'afternoon': ['Cathedral', 'Harbour cruise', 'Street food', 'Gallery', 'Beach', 'Shopping district'],
+    'evening': ['Rooftop dinner', 'Night market', 'Concert', 'Sunset viewpoint', 'Wine bar', 'Theatre']
+}
+
+def generate_batch(first_user_id: int, user_count: int, trips_per_user: int,
+                   password_hash: str, password_salt: str, seed: int) -> tuple[list, list]:
+    """
+    Generate rows for a contiguous block of users and their trips.
+
+    Rows are plain dicts ready for a bulk INSERT, so this runs in worker
+    processes without touching the database. Itineraries are returned
+    already JSON encoded under 'itinerary_json' to keep serialization off
+    the inserting process.
+
+    Args:
+        first_user_id: Primary key of the first user in the block
+        user_count: Number of users to generate
+        trips_per_user: Number of trips per user
+        password_hash: Precomputed hash shared by all generated users
+        password_salt: Salt matching password_hash
+        seed: Random seed, combined with first_user_id for reproducibility
+
+    Returns:
+        tuple: (user_rows, trip_rows)
+    """
+    rng = random.Random(seed * 1_000_003 + first_user_id)
+    now = datetime.now(timezone.utc)
+    user_rows, trip_rows = [], []
+
+    for user_id in range(first_user_id, first_user_id + user_count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created_at = now - timedelta(days=rng.randint(0, 1095), seconds=rng.randint(0, 86399))
+        user_rows.append({
+            'id': user_id,
+            'username': f'{first}.{last}{user_id}',
+            'email': f'{first}.{last}{user_id}@{rng.choice(EMAIL_DOMAINS)}',
+            'password_hash': password_hash,
+            'password_salt': password_salt,
+            'email_verified': rng.random() < 0.9,
+            'created_at': created_at,
+            'updated_at': created_at
+        })
+
+        for _ in range(trips_per_user):
+            destination, latitude, longitude = rng.choice(DESTINATIONS)
+            start_date = (now + timedelta(days=rng.randint(-730, 365))).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+            duration = rng.randint(2, 14)
+            trip_rows.append({
+                'user_id': user_id,
+                'title': f'{rng.choice(TRIP_STYLES)} {destination.split(",")[0]}',
+                'destination': destination,
+                'latitude': round(latitude + rng.uniform(-0.05, 0.05), 6),
+                'longitude': round(longitude + rng.uniform(-0.05, 0.05), 6),
+                'start_date': start_date,
+                'end_date': start_date + timedelta(days=duration - 1),
+                'itinerary_json': json.dumps({
+                    f'day{day}': {slot: rng.choice(options) for slot, options in ACTIVITIES.items()}
+                    for day in range(1, duration + 1)
+                }),
+                'created_at': created_at,
+                'updated_at': created_at
+            })
+
+    return user_rows, trip_rows
+
+def generate_batch_args(args: tuple) -> tuple[list, list]:
+    """Unpack a task tuple for multiprocessing.Pool.imap."""
+    return generate_batch(*args)
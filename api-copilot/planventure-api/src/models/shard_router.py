@@ -0,0 +1,50 @@
+import sqlalchemy as sa
+from flask_sqlalchemy.session import Session
+
+# Tables partitioned by user id; everything else lives in the main database
+SHARDED_TABLES = {'user', 'trip', 'revoked_token', 'trip_deletion', 'trip_change_counter', 'user_trip_stats'}
+
+def shard_bind_key(shard: int) -> str:
+    """SQLALCHEMY_BINDS key of a shard database."""
+    return f'shard{shard}'
+
+class NoShardSelectedError(sa.exc.UnboundExecutionError):
+    """A sharded table was used before the session was pointed at a shard."""
+
+class ShardedSession(Session):
+    """
+    Session that routes user-owned tables to the selected shard.
+
+    When SHARD_DATABASE_URLS is set, rows of SHARDED_TABLES live in one of
+    several databases chosen by user id. The shard for the current unit of
+    work is kept in session.info['shard'] (see src.services.sharding);
+    other tables, and all tables when sharding is off, use the normal
+    Flask-SQLAlchemy bind lookup.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            table = _sharded_table(mapper, clause)
+            engines = self._db.engines
+            if table is not None and shard_bind_key(0) in engines:
+                shard = self.info.get('shard')
+                if shard is None:
+                    raise NoShardSelectedError(f"No shard selected for table '{table.name}'")
+                return engines[shard_bind_key(shard)]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def _sharded_table(mapper, clause):
+    """Return the sharded table a statement targets, if any."""
+    tables = []
+    if mapper is not None:
+        tables.append(sa.inspect(mapper).local_table)
+    if isinstance(clause, sa.Table):
+        tables.append(clause)
+    elif isinstance(clause, sa.UpdateBase):
+        tables.append(clause.table)
+    elif isinstance(clause, sa.Select):
+        tables.extend(clause.get_final_froms())
+    for table in tables:
+        if isinstance(table, sa.Table) and table.name in SHARDED_TABLES:
+            return table
+    return None
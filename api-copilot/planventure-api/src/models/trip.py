@@ -13,10 +13,23 @@ class Trip(db.Model):
     itinerary = db.Column(db.JSON)  # Store itinerary as JSON for flexibility
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    change_seq = db.Column(db.Integer, nullable=False, default=0)  # Per-user change feed position, see trip_changes
 
     # Relationship with User model
     user = db.relationship('User', backref=db.backref('trips', lazy=True))
 
+    __table_args__ = (
+        # Serves the /my/trips/changes keyset scan
+        db.Index('ix_trip_user_id_change_seq', 'user_id', 'change_seq', 'id'),
+    )
+
+    __mapper_args__ = {
+        # Optimistic concurrency: an UPDATE only matches the updated_at that
+        # was read, otherwise SQLAlchemy raises StaleDataError
+        'version_id_col': updated_at,
+        'version_id_generator': lambda version: datetime.now(timezone.utc)
+    }
+
     def __repr__(self):
         return f'<Trip {self.title} to {self.destination}>'
 
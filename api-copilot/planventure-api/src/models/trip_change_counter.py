@@ -0,0 +1,9 @@
+from src.models import db
+
+class TripChangeCounter(db.Model):
+    """Last change sequence number handed out for a user's trips."""
+    user_id = db.Column(db.Integer, primary_key=True)
+    last_seq = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<TripChangeCounter user={self.user_id} seq={self.last_seq}>'
@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+from src.models import db
+
+class TripDeletion(db.Model):
+    """Tombstone for a deleted trip, read by the /my/trips/changes feed."""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    trip_id = db.Column(db.Integer, nullable=False)
+    change_seq = db.Column(db.Integer, nullable=False, default=0)  # Per-user change feed position
+    deleted_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+
+    __table_args__ = (
+        db.Index('ix_trip_deletion_user_id_change_seq', 'user_id', 'change_seq'),
+    )
+
+    def __repr__(self):
+        return f'<TripDeletion trip={self.trip_id}>'
+
+    def to_dict(self):
+        return {
+            'id': self.trip_id,
+            'deleted_at': self.deleted_at.isoformat()
+        }
@@ -0,0 +1,25 @@
+from datetime import datetime, timezone
+from src.models import db
+
+class UserTripStats(db.Model):
+    """Per-user travel summary, kept in step with the user's trips."""
+    user_id = db.Column(db.Integer, primary_key=True)
+    trip_count = db.Column(db.Integer, nullable=False, default=0)
+    total_days = db.Column(db.Integer, nullable=False, default=0)
+    trips_per_year = db.Column(db.JSON, nullable=False, default=dict)  # {"2025": 3, ...}
+    destination_counts = db.Column(db.JSON, nullable=False, default=dict)  # {"Paris, France": 2, ...}
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<UserTripStats user={self.user_id}>'
+
+    def to_dict(self, top: int = 5):
+        top_destinations = sorted(self.destination_counts.items(), key=lambda item: (-item[1], item[0]))[:top]
+        return {
+            'trip_count': self.trip_count,
+            'total_days': self.total_days,
+            'trips_per_year': dict(sorted(self.trips_per_year.items())),
+            'top_destinations': [
+                {'destination': destination, 'trips': count} for destination, count in top_destinations
+            ]
+        }
@@ -6,6 +6,12 @@ import base64
 SALT_LENGTH = 32  # Length of the salt in bytes
 HASH_METHOD = 'pbkdf2:sha256:260000'  # Using PBKDF2 with SHA256 and 260000 iterations
 
+# Client-facing messages for unique constraint violations on the user table
+DUPLICATE_USER_ERRORS = {
+    'username': 'Username already taken',
+    'email': 'Email already registered'
+}
+
 def generate_salt() -> str:
     """Generate a cryptographically secure random salt."""
     return base64.b64encode(secrets.token_bytes(SALT_LENGTH)).decode('utf-8')
@@ -54,3 +60,20 @@ def hash_token(token: str) -> str:
     Used for password reset tokens, email verification, etc.
     """
     return hashlib.sha256(token.encode()).hexdigest()
+
+def duplicate_user_field(error) -> str:
+    """
+    Work out which unique user column an IntegrityError violated.
+    
+    Args:
+        error: The sqlalchemy.exc.IntegrityError raised on insert
+        
+    Returns:
+        str: 'username', 'email', or None if neither can be identified
+    """
+    message = str(getattr(error, 'orig', error)).lower()
+    if 'username' in message:
+        return 'username'
+    if 'email' in message:
+        return 'email'
+    return None
@@ -2,12 +2,18 @@ from flask import Blueprint, jsonify, request, current_app, render_template_stri
 from src.models import db, User
 from src.services.jwt_manager import JWTManager
 from src.services.email_service import send_verification_email
+from src.services.rate_limiter import rate_limited
+from src.services.availability import availability_index
+from src.services.sharding import add_user, find_user, find_on_any_shard
+from src.models.user_utils import duplicate_user_field, DUPLICATE_USER_ERRORS
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta, timezone
 import secrets
 
 auth = Blueprint('auth', __name__)
 
 @auth.route('/register', methods=['POST'])
+@rate_limited('username', 'email')
 def register():
     """Register a new user with email verification."""
     data = request.get_json()
@@ -17,14 +23,8 @@ def register():
     if not all(field in data for field in required_fields):
         return jsonify({'error': 'Missing required fields'}), 400
     
-    # Check if username or email already exists
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({'error': 'Username already taken'}), 400
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({'error': 'Email already registered'}), 400
-    
     # Create new user
-    user = User(        
+    user = User(
         username=data['username'],
         email=data['email'],
         email_verified=False,
@@ -33,9 +33,14 @@ def register():
     )
     user.set_password(data['password'])
     
-    # Save user
-    db.session.add(user)
-    db.session.commit()
+    # Save user; the unique constraints reject duplicates in the same statement
+    try:
+        add_user(user)
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        return jsonify({'error': DUPLICATE_USER_ERRORS.get(duplicate_user_field(e), 'User already exists')}), 400
+    availability_index.add(user.username, user.email)
     
     # Send verification email
     try:
@@ -49,6 +54,20 @@ def register():
         'user': user.to_dict()
     }), 201
 
+@auth.route('/check-availability', methods=['GET'])
+@rate_limited(ip_limit='availability')
+def check_availability():
+    """Check whether a username and/or email can still be registered."""
+    fields = {field: request.args.get(field) for field in ('username', 'email') if request.args.get(field)}
+    
+    if not fields:
+        return jsonify({'error': 'Provide a username or email to check'}), 400
+    
+    return jsonify({
+        field: {'value': value, 'available': availability_index.is_available(field, value)}
+        for field, value in fields.items()
+    }), 200
+
 @auth.route('/verify-email', methods=['POST'])
 def verify_email():
     """Verify user's email address."""
@@ -58,8 +77,8 @@ def verify_email():
     if not token:
         return jsonify({'error': 'Verification token is required'}), 400
     
-    # Find user by verification token
-    user = User.query.filter_by(email_verification_token=token).first()
+    # Find user by verification token (tokens do not name a shard, so all are checked)
+    user = find_on_any_shard(lambda: User.query.filter_by(email_verification_token=token).first())
     
     if not user:
         return jsonify({'error': 'Invalid verification token'}), 400
@@ -94,8 +113,8 @@ def verify_email_from_link():
     if not token:
         return "Verification token is missing", 400
     
-    # Find user by verification token
-    user = User.query.filter_by(email_verification_token=token).first()
+    # Find user by verification token (tokens do not name a shard, so all are checked)
+    user = find_on_any_shard(lambda: User.query.filter_by(email_verification_token=token).first())
     
     if not user:
         return "Invalid verification token", 400
@@ -155,6 +174,7 @@ def verify_email_from_link():
     return render_template_string(success_html)
 
 @auth.route('/resend-verification', methods=['POST'])
+@rate_limited('email')
 def resend_verification():
     """Resend verification email."""
     data = request.get_json()
@@ -163,7 +183,7 @@ def resend_verification():
     if not email:
         return jsonify({'error': 'Email is required'}), 400
     
-    user = User.query.filter_by(email=email).first()
+    user = find_user(email=email)
     
     if not user:
         return jsonify({'error': 'User not found'}), 404
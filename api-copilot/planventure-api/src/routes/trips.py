@@ -1,20 +1,113 @@
-from flask import Blueprint, jsonify, request
-from src.models import db, Trip
+from flask import Blueprint, jsonify, request, current_app
+from sqlalchemy.orm.exc import StaleDataError
+from src.models import db, Trip, TripDeletion, UserTripStats
 from src.services.auth import token_required
-from datetime import datetime
+from src.services.trip_changes import get_changes, CursorExpiredError
+from src.services.json_patch import apply_json_patch, apply_merge_patch, JsonPatchError
+from src.services.trip_stats import trip_contribution, record_trip_change
+from datetime import datetime, timezone
 
 trips = Blueprint('trips', __name__)
 
+# Fields a client may change through PUT or PATCH
+EDITABLE_FIELDS = ['title', 'destination', 'latitude', 'longitude', 'start_date', 'end_date', 'itinerary']
+REQUIRED_FIELDS = {'title', 'destination', 'start_date', 'end_date'}
+
+def parse_trip_date(value):
+    """Parse an ISO date/datetime string into a naive UTC datetime."""
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 def validate_trip_dates(start_date, end_date):
     try:
-        start = datetime.strptime(start_date, '%Y-%m-%d')
-        end = datetime.strptime(end_date, '%Y-%m-%d')
+        start = parse_trip_date(start_date)
+        end = parse_trip_date(end_date)
         if end < start:
             return False, "End date must be after start date"
         return True, None
-    except ValueError:
+    except (TypeError, ValueError):
         return False, "Invalid date format. Use YYYY-MM-DD"
 
+def trip_version(trip):
+    """Entity tag for a trip, derived from its updated_at version column."""
+    return f"{trip.id}-{trip.updated_at.strftime('%Y%m%d%H%M%S%f')}"
+
+def editable_document(trip):
+    """The part of a trip that PATCH operates on."""
+    return {
+        'title': trip.title,
+        'destination': trip.destination,
+        'latitude': trip.latitude,
+        'longitude': trip.longitude,
+        'start_date': trip.start_date.isoformat(),
+        'end_date': trip.end_date.isoformat(),
+        'itinerary': trip.itinerary
+    }
+
+def apply_trip_changes(trip, data):
+    """
+    Validate and apply new field values to a trip.
+    
+    Only fields whose value actually changes are assigned, so unchanged
+    columns (notably a large itinerary) are left out of the UPDATE.
+    
+    Returns:
+        str: An error message, or None if the changes were applied
+    """
+    unknown = set(data) - set(EDITABLE_FIELDS)
+    if unknown:
+        return f"Unknown fields: {', '.join(sorted(unknown))}"
+    for field in REQUIRED_FIELDS & set(data):
+        if data[field] in (None, ''):
+            return f"{field} is required"
+    
+    changes = dict(data)
+    if 'start_date' in data or 'end_date' in data:
+        start_date = data.get('start_date', trip.start_date)
+        end_date = data.get('end_date', trip.end_date)
+        is_valid, error_msg = validate_trip_dates(start_date, end_date)
+        if not is_valid:
+            return error_msg
+        if 'start_date' in data:
+            changes['start_date'] = parse_trip_date(start_date)
+        if 'end_date' in data:
+            changes['end_date'] = parse_trip_date(end_date)
+    
+    for field, value in changes.items():
+        if getattr(trip, field) != value:
+            setattr(trip, field, value)
+    return None
+
+def precondition_failed(trip):
+    """Return a 412 response if If-Match names a different trip version."""
+    if request.if_match and not request.if_match.contains_weak(trip_version(trip)):
+        return jsonify({'error': 'Trip has been modified', 'etag': trip_version(trip)}), 412
+    return None
+
+def commit_trip_update(trip, before):
+    """
+    Commit a trip update, mapping a lost version race to 412.
+    
+    Args:
+        trip: The modified trip
+        before: trip_contribution() taken before the changes were applied
+    """
+    if not db.session.dirty:
+        response = jsonify(trip.to_dict())
+    else:
+        try:
+            record_trip_change(trip.user_id, before, trip_contribution(trip))
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            return jsonify({'error': 'Trip has been modified'}), 412
+        response = jsonify(trip.to_dict())
+    response.set_etag(trip_version(trip))
+    return response
+
 @trips.route('/trips', methods=['POST'])
 @token_required
 def create_trip(current_user):
@@ -47,6 +140,7 @@ def create_trip(current_user):
         )
         
         db.session.add(trip)
+        record_trip_change(current_user.id, after=trip_contribution(trip))
         db.session.commit()
         
         return jsonify(trip.to_dict()), 201
@@ -61,7 +155,9 @@ def get_trip(current_user, trip_id):
     # Check if the trip belongs to the current user
     if trip.user_id != current_user.id:
         return jsonify({'error': 'Unauthorized access'}), 403
-    return jsonify(trip.to_dict())
+    response = jsonify(trip.to_dict())
+    response.set_etag(trip_version(trip))
+    return response.make_conditional(request)
 
 @trips.route('/my/trips', methods=['GET'])
 @token_required
@@ -76,7 +172,7 @@ def get_user_trips(current_user):
         .order_by(Trip.start_date.desc())\
         .paginate(page=page, per_page=per_page, error_out=False)
     
-    return jsonify({
+    response = jsonify({
         'trips': [trip.to_dict() for trip in trips.items],
         'total': trips.total,
         'pages': trips.pages,
@@ -84,6 +180,46 @@ def get_user_trips(current_user):
         'has_next': trips.has_next,
         'has_prev': trips.has_prev
     })
+    # ETag lets clients revalidate with If-None-Match and lets compressed
+    # bodies be cached
+    response.add_etag()
+    return response.make_conditional(request)
+
+@trips.route('/my/trips/changes', methods=['GET'])
+@token_required
+def get_user_trip_changes(current_user):
+    """Return trips changed and deleted since the ?since= cursor."""
+    page_size = current_app.config['TRIP_CHANGES_PAGE_SIZE']
+    limit = min(request.args.get('limit', page_size, type=int), page_size * 5)
+    if limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+    
+    try:
+        changes = get_changes(
+            current_user.id,
+            request.args.get('since'),
+            limit,
+            current_app.config['TRIP_DELETION_RETENTION']
+        )
+    except CursorExpiredError:
+        return jsonify({'error': 'Cursor has expired. Resync without since.'}), 410
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    return jsonify(changes)
+
+@trips.route('/my/stats', methods=['GET'])
+@token_required
+def get_user_stats(current_user):
+    """Return trip count, total days, trips per year and top destinations."""
+    top = min(request.args.get('top', 5, type=int), 20)
+    if top < 0:
+        return jsonify({'error': 'top must not be negative'}), 400
+    
+    stats = db.session.get(UserTripStats, current_user.id)
+    if stats is None:
+        return jsonify({'trip_count': 0, 'total_days': 0, 'trips_per_year': {}, 'top_destinations': []})
+    return jsonify(stats.to_dict(top=top))
 
 @trips.route('/trips/<int:trip_id>', methods=['PUT'])
 @token_required
@@ -94,30 +230,74 @@ def update_trip(current_user, trip_id):
     if trip.user_id != current_user.id:
         return jsonify({'error': 'Unauthorized access'}), 403
     
+    failed = precondition_failed(trip)
+    if failed:
+        return failed
+    
     data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
     
-    # If dates are being updated, validate them
-    if 'start_date' in data and 'end_date' in data:
-        is_valid, error_msg = validate_trip_dates(data['start_date'], data['end_date'])
-        if not is_valid:
-            return jsonify({'error': error_msg}), 400
-    elif 'start_date' in data:
-        is_valid, error_msg = validate_trip_dates(data['start_date'], trip.end_date)
-        if not is_valid:
-            return jsonify({'error': error_msg}), 400
-    elif 'end_date' in data:
-        is_valid, error_msg = validate_trip_dates(trip.start_date, data['end_date'])
-        if not is_valid:
-            return jsonify({'error': error_msg}), 400
+    before = trip_contribution(trip)
+    error_msg = apply_trip_changes(trip, {field: data[field] for field in EDITABLE_FIELDS if field in data})
+    if error_msg:
+        return jsonify({'error': error_msg}), 400
+    
+    return commit_trip_update(trip, before)
+
+@trips.route('/trips/<int:trip_id>', methods=['PATCH'])
+@token_required
+def patch_trip(current_user, trip_id):
+    """
+    Partially update a trip.
+    
+    Accepts an RFC 6902 JSON Patch (application/json-patch+json) or an
+    RFC 7396 merge patch (application/merge-patch+json) against the trip's
+    editable fields, e.g. [{"op": "replace", "path": "/itinerary/day3/morning",
+    "value": "Louvre"}]. Send the trip's ETag in If-Match to reject the
+    patch if someone else changed the trip first.
+    """
+    trip = Trip.query.get_or_404(trip_id)
     
-    # Update fields
-    for field in ['title', 'description', 'start_date', 'end_date', 'location']:
-        if field in data:
-            setattr(trip, field, data[field])
+    # Check if the trip belongs to the current user
+    if trip.user_id != current_user.id:
+        return jsonify({'error': 'Unauthorized access'}), 403
     
-    db.session.commit()
+    failed = precondition_failed(trip)
+    if failed:
+        return failed
+    
+    patch = request.get_json(force=True, silent=True)
+    if patch is None:
+        return jsonify({'error': 'Request body must be JSON'}), 400
+    
+    document = editable_document(trip)
+    try:
+        if request.mimetype == 'application/json-patch+json':
+            patched = apply_json_patch(document, patch)
+        elif request.mimetype == 'application/merge-patch+json':
+            if not isinstance(patch, dict):
+                return jsonify({'error': 'A merge patch must be a JSON object'}), 400
+            patched = apply_merge_patch(document, patch)
+        else:
+            return jsonify({
+                'error': 'Use Content-Type application/json-patch+json or application/merge-patch+json'
+            }), 415
+    except JsonPatchError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return jsonify(trip.to_dict())
+    if not isinstance(patched, dict):
+        return jsonify({'error': 'Patched trip must be a JSON object'}), 400
+    
+    # Fields removed by the patch become null
+    changes = {field: patched.get(field) for field in set(EDITABLE_FIELDS) | set(patched)
+               if patched.get(field) != document.get(field)}
+    before = trip_contribution(trip)
+    error_msg = apply_trip_changes(trip, changes)
+    if error_msg:
+        return jsonify({'error': error_msg}), 400
+    
+    return commit_trip_update(trip, before)
 
 @trips.route('/trips/<int:trip_id>', methods=['DELETE'])
 @token_required
@@ -128,7 +308,14 @@ def delete_trip(current_user, trip_id):
     if trip.user_id != current_user.id:
         return jsonify({'error': 'Unauthorized access'}), 403
         
+    # Leave a tombstone for the change feed in the same transaction
+    db.session.add(TripDeletion(user_id=trip.user_id, trip_id=trip.id))
     db.session.delete(trip)
-    db.session.commit()
+    try:
+        record_trip_change(trip.user_id, before=trip_contribution(trip))
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({'error': 'Trip was modified while being deleted'}), 409
     
     return jsonify({'message': 'Trip deleted successfully'}), 200
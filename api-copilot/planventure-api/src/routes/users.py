@@ -2,12 +2,19 @@ from flask import Blueprint, jsonify, request
 from src.models import db, User
 from src.services.jwt_manager import JWTManager
 from src.services.auth import token_required
+from src.services.rate_limiter import rate_limited
+from src.services.token_revocation import revocation_list
+from src.services.availability import availability_index
+from src.services.sharding import add_user, find_user, select_user_shard
+from src.models.user_utils import duplicate_user_field, DUPLICATE_USER_ERRORS
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timezone
 import jwt
 
 users = Blueprint('users', __name__)
 
 @users.route('/users', methods=['POST'])
+@rate_limited('username', 'email')
 def create_user():
     data = request.get_json()
     
@@ -16,12 +23,6 @@ def create_user():
     if not all(field in data for field in required_fields):
         return jsonify({'error': 'Missing required fields'}), 400
     
-    # Check if username or email already exists
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({'error': 'Username already taken'}), 400
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({'error': 'Email already registered'}), 400
-    
     # Create new user
     user = User(
         username=data['username'],
@@ -29,24 +30,31 @@ def create_user():
     )
     user.set_password(data['password'])
     
-    db.session.add(user)
-    db.session.commit()
+    try:
+        add_user(user)
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        return jsonify({'error': DUPLICATE_USER_ERRORS.get(duplicate_user_field(e), 'User already exists')}), 400
+    availability_index.add(user.username, user.email)
     
     return jsonify(user.to_dict()), 201
 
 @users.route('/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
+    select_user_shard(user_id)
     user = User.query.get_or_404(user_id)
     return jsonify(user.to_dict())
 
 @users.route('/login', methods=['POST'])
+@rate_limited('username')
 def login():
     data = request.get_json()
     
     if not data or not data.get('username') or not data.get('password'):
         return jsonify({'error': 'Missing username or password'}), 400
         
-    user = User.query.filter_by(username=data['username']).first()
+    user = find_user(username=data['username'])
     if not user or not user.check_password(data['password']):
         return jsonify({'error': 'Invalid username or password'}), 401
       # Update last login timestamp
@@ -72,26 +80,39 @@ def refresh_token():
         return jsonify({'error': 'Refresh token is required'}), 400
         
     try:
-        # Verify refresh token
-        if not JWTManager.verify_refresh_token(refresh_token):
-            return jsonify({'error': 'Invalid refresh token'}), 401
-            
-        # Decode token to get user ID
-        payload = JWTManager.decode_token(refresh_token)
-        user = User.query.get(payload['user_id'])
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 401
-            
-        # Generate new access token
-        new_access_token = JWTManager.generate_token(user)
-        
-        return jsonify({
-            'access_token': new_access_token
-        }), 200
-        
+        # Verify and decode refresh token in one pass
+        payload = JWTManager.decode_refresh_token(refresh_token)
     except jwt.InvalidTokenError:
         return jsonify({'error': 'Invalid refresh token'}), 401
+    
+    # Revocations live on the user's shard
+    select_user_shard(payload['user_id'])
+    if revocation_list.is_revoked(payload['jti']):
+        return jsonify({'error': 'Refresh token has been revoked'}), 401
+        
+    user = User.query.get(payload['user_id'])
+    if not user:
+        return jsonify({'error': 'User not found'}), 401
+    
+    # Rotate: revoke the presented token before issuing a new pair. The
+    # insert fails if another request already used this token.
+    try:
+        revocation_list.revoke(
+            payload['jti'],
+            user.id,
+            datetime.fromtimestamp(payload['exp'], timezone.utc)
+        )
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        revocation_list.remember(payload['jti'])
+        return jsonify({'error': 'Refresh token has been revoked'}), 401
+    revocation_list.remember(payload['jti'])
+    
+    return jsonify({
+        'access_token': JWTManager.generate_token(user),
+        'refresh_token': JWTManager.generate_refresh_token(user)
+    }), 200
 
 @users.route('/me', methods=['GET'])
 @token_required
@@ -3,6 +3,7 @@ from flask import request, jsonify, current_app
 import jwt
 from src.models import User
 from src.services.jwt_manager import JWTManager
+from src.services.sharding import select_user_shard
 
 def token_required(f):
     """
@@ -37,7 +38,8 @@ def token_required(f):
             if payload.get('type') != 'access':
                 return jsonify({'error': 'Invalid token type'}), 401
             
-            # Add user to request context
+            # Add user to request context; the token's user id names the shard
+            select_user_shard(payload['user_id'])
             current_user = User.query.get(payload['user_id'])
             if not current_user:
                 return jsonify({'error': 'User not found'}), 401
@@ -0,0 +1,63 @@
+import threading
+from src.models import db
+from src.services.bloom import BloomFilter
+from src.services.sharding import user_directory
+
+class AvailabilityIndex:
+    """
+    In-memory index of taken usernames and emails.
+
+    Built from the user table at startup and updated after each insert.
+    A miss in the Bloom filter means the value is free without touching
+    the database; only hits are confirmed with an indexed lookup. Each
+    process keeps its own index, so answers are advisory: registration
+    itself is guarded by the unique constraints.
+    """
+
+    def __init__(self):
+        self._filter = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.capacity = app.config['AVAILABILITY_FILTER_CAPACITY']
+        self.error_rate = app.config['AVAILABILITY_FILTER_ERROR_RATE']
+        app.extensions['availability_index'] = self
+        with app.app_context():
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        """Reload the index from every username and email (the directory when sharded)."""
+        users = user_directory()
+        rows = db.session.query(users.username, users.email)
+        bloom = BloomFilter(max(self.capacity, rows.count() * 4), self.error_rate)
+        for username, email in rows.yield_per(10000):
+            bloom.add(f'username:{username}')
+            bloom.add(f'email:{email}')
+        with self._lock:
+            self._filter = bloom
+
+    def add(self, username: str, email: str) -> None:
+        """Record a newly committed user."""
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(f'username:{username}')
+                self._filter.add(f'email:{email}')
+
+    def is_available(self, field: str, value: str) -> bool:
+        """
+        Check whether a username or email is free.
+
+        Args:
+            field: Either 'username' or 'email'
+            value: The value to check
+
+        Returns:
+            bool: True if no user has this value
+        """
+        if self._filter is not None and f'{field}:{value}' not in self._filter:
+            return True
+        users = user_directory()
+        column = users.username if field == 'username' else users.email
+        return not db.session.query(users.query.filter(column == value).exists()).scalar()
+
+availability_index = AvailabilityIndex()
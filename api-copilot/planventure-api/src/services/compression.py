@@ -0,0 +1,175 @@
+import threading
+import zlib
+from collections import OrderedDict
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+class GzipCodec:
+    name = 'gzip'
+
+    @staticmethod
+    def compress(data: bytes, level: int) -> bytes:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+        return compressor.compress(data) + compressor.flush()
+
+    @staticmethod
+    def stream(chunks, level: int):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+class BrotliCodec:
+    name = 'br'
+
+    @staticmethod
+    def compress(data: bytes, level: int) -> bytes:
+        return brotli.compress(data, quality=level)
+
+    @staticmethod
+    def stream(chunks, level: int):
+        compressor = brotli.Compressor(quality=level)
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+
+class ZstdCodec:
+    name = 'zstd'
+
+    @staticmethod
+    def compress(data: bytes, level: int) -> bytes:
+        return zstandard.ZstdCompressor(level=level).compress(data)
+
+    @staticmethod
+    def stream(chunks, level: int):
+        compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+def available_codecs() -> dict:
+    """Return the codecs whose libraries are installed, keyed by encoding name."""
+    codecs = {'gzip': GzipCodec}
+    if brotli is not None:
+        codecs['br'] = BrotliCodec
+    if zstandard is not None:
+        codecs['zstd'] = ZstdCodec
+    return codecs
+
+class CompressedBodyCache:
+    """LRU cache of compressed bodies keyed by (ETag, encoding)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def set(self, key, body: bytes) -> None:
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+def _choose_codec(codecs: dict, preference: list):
+    """Pick the preferred codec with the highest quality in Accept-Encoding."""
+    best, best_quality = None, 0
+    for name in preference:
+        if name not in codecs:
+            continue
+        quality = request.accept_encodings.quality(name)
+        if quality > best_quality:
+            best, best_quality = codecs[name], quality
+    return best
+
+def init_compression(app) -> None:
+    """
+    Compress responses with gzip, brotli or zstd based on Accept-Encoding.
+
+    Only responses whose mimetype is in COMPRESS_MIMETYPES are compressed,
+    and buffered bodies smaller than COMPRESS_MIN_SIZE are left alone.
+    Streamed responses are compressed chunk by chunk. Bodies of responses
+    carrying an ETag are cached per encoding, so repeated requests for an
+    unchanged resource skip compression.
+
+    brotli and zstd are used only when the Brotli and zstandard packages
+    are installed.
+    """
+    if not app.config['COMPRESS_ENABLED']:
+        return
+
+    codecs = available_codecs()
+    preference = [name.strip() for name in app.config['COMPRESS_ALGORITHMS'].split(',') if name.strip()]
+    levels = {
+        'gzip': app.config['COMPRESS_LEVEL_GZIP'],
+        'br': app.config['COMPRESS_LEVEL_BR'],
+        'zstd': app.config['COMPRESS_LEVEL_ZSTD']
+    }
+    mimetypes = {m.strip() for m in app.config['COMPRESS_MIMETYPES'].split(',') if m.strip()}
+    min_size = app.config['COMPRESS_MIN_SIZE']
+    cache = CompressedBodyCache(app.config['COMPRESS_CACHE_SIZE'])
+    app.extensions['compression_cache'] = cache
+
+    @app.after_request
+    def compress_response(response):
+        if response.mimetype not in mimetypes or response.direct_passthrough:
+            return response
+        if response.status_code < 200 or response.status_code in (204, 304):
+            return response
+        if 'Content-Encoding' in response.headers:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        codec = _choose_codec(codecs, preference)
+        if codec is None:
+            return response
+        level = levels[codec.name]
+
+        if response.is_streamed:
+            response.response = codec.stream(response.iter_encoded(), level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+
+            etag, weak = response.get_etag()
+            cache_key = (etag, weak, codec.name, level) if etag else None
+            body = cache.get(cache_key) if cache_key else None
+            if body is None:
+                body = codec.compress(data, level)
+                if cache_key:
+                    cache.set(cache_key, body)
+            if len(body) >= len(data):
+                return response
+
+            response.set_data(body)
+            if etag and not weak:
+                # The bytes differ from the identity encoding, so the tag can
+                # only promise semantic equivalence; If-None-Match still matches
+                response.set_etag(etag, weak=True)
+
+        response.headers['Content-Encoding'] = codec.name
+        return response
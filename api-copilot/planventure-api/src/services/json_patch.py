@@ -0,0 +1,148 @@
+import copy
+import re
+
+class JsonPatchError(Exception):
+    """A patch could not be applied to the target document."""
+
+def _parse_pointer(pointer: str) -> list:
+    """Split an RFC 6901 JSON Pointer into unescaped reference tokens."""
+    if pointer == '':
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith('/'):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace('~1', '/').replace('~0', '~') for token in pointer[1:].split('/')]
+
+def _array_index(container: list, token: str, allow_end: bool) -> int:
+    if allow_end and token == '-':
+        return len(container)
+    # ASCII digits only: str.isdigit() also accepts characters like '²' that int() rejects
+    if not re.fullmatch(r'0|[1-9][0-9]*', token):
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {index}")
+    return index
+
+def _resolve_parent(document, tokens: list):
+    """Return the container holding the last token of a pointer."""
+    if not tokens:
+        raise JsonPatchError("Operation cannot target the document root")
+    node = document
+    for token in tokens[:-1]:
+        if isinstance(node, dict):
+            if token not in node:
+                raise JsonPatchError(f"Path not found: {token!r}")
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_array_index(node, token, allow_end=False)]
+        else:
+            raise JsonPatchError(f"Cannot traverse into {type(node).__name__}")
+    return node, tokens[-1]
+
+def _get(document, tokens: list):
+    if not tokens:
+        return document
+    parent, key = _resolve_parent(document, tokens)
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise JsonPatchError(f"Path not found: {key!r}")
+        return parent[key]
+    if isinstance(parent, list):
+        return parent[_array_index(parent, key, allow_end=False)]
+    raise JsonPatchError(f"Cannot read from {type(parent).__name__}")
+
+def _add(document, tokens: list, value):
+    parent, key = _resolve_parent(document, tokens)
+    if isinstance(parent, dict):
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent.insert(_array_index(parent, key, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to {type(parent).__name__}")
+
+def _remove(document, tokens: list):
+    parent, key = _resolve_parent(document, tokens)
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise JsonPatchError(f"Path not found: {key!r}")
+        return parent.pop(key)
+    if isinstance(parent, list):
+        return parent.pop(_array_index(parent, key, allow_end=False))
+    raise JsonPatchError(f"Cannot remove from {type(parent).__name__}")
+
+def apply_json_patch(document, operations: list):
+    """
+    Apply an RFC 6902 JSON Patch.
+
+    Args:
+        document: The JSON document to patch (left unmodified)
+        operations: List of operation objects (add, remove, replace, move, copy, test)
+
+    Returns:
+        The patched copy of the document
+
+    Raises:
+        JsonPatchError: If any operation is malformed or fails; no partial
+            result is returned
+    """
+    if not isinstance(operations, list):
+        raise JsonPatchError("A JSON Patch must be an array of operations")
+
+    result = copy.deepcopy(document)
+    for operation in operations:
+        if not isinstance(operation, dict) or 'op' not in operation or 'path' not in operation:
+            raise JsonPatchError("Each operation needs 'op' and 'path'")
+        op = operation['op']
+        path = _parse_pointer(operation['path'])
+
+        if op in ('add', 'replace', 'test') and 'value' not in operation:
+            raise JsonPatchError(f"'{op}' operation needs a 'value'")
+        if op in ('move', 'copy') and 'from' not in operation:
+            raise JsonPatchError(f"'{op}' operation needs a 'from'")
+
+        if op == 'add':
+            if not path:
+                result = copy.deepcopy(operation['value'])
+            else:
+                _add(result, path, copy.deepcopy(operation['value']))
+        elif op == 'remove':
+            _remove(result, path)
+        elif op == 'replace':
+            if not path:
+                result = copy.deepcopy(operation['value'])
+            else:
+                _remove(result, path)
+                _add(result, path, copy.deepcopy(operation['value']))
+        elif op == 'move':
+            source = _parse_pointer(operation['from'])
+            if path[:len(source)] == source and path != source:
+                raise JsonPatchError("Cannot move a value into one of its children")
+            _add(result, path, _remove(result, source))
+        elif op == 'copy':
+            _add(result, path, copy.deepcopy(_get(result, _parse_pointer(operation['from']))))
+        elif op == 'test':
+            if _get(result, path) != operation['value']:
+                raise JsonPatchError(f"Test failed at {operation['path']!r}")
+        else:
+            raise JsonPatchError(f"Unknown operation: {op!r}")
+    return result
+
+def apply_merge_patch(target, patch):
+    """
+    Apply an RFC 7396 JSON Merge Patch.
+
+    Objects are merged recursively, null removes a member and any other
+    value replaces the target outright.
+
+    Returns:
+        The patched copy of target
+    """
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = copy.deepcopy(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
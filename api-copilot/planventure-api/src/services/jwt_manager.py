@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta, timezone
+import uuid
 import jwt
 from typing import Optional, Dict, Any
 from flask import current_app
@@ -37,15 +38,20 @@ class JWTManager:
         """
         Generate a refresh token for a user.
         
+        Each refresh token carries a unique jti so it can be rotated and
+        revoked individually.
+        
         Args:
             user: The User instance to generate refresh token for
             
         Returns:
             str: The encoded refresh token
         """
-        payload = {            'user_id': user.id,
-            'exp': datetime.now(timezone.utc) + timedelta(days=30),  # 30 days expiration
+        payload = {
+            'user_id': user.id,
+            'exp': datetime.now(timezone.utc) + timedelta(seconds=current_app.config['JWT_REFRESH_TOKEN_EXPIRES']),
             'iat': datetime.now(timezone.utc),
+            'jti': uuid.uuid4().hex,
             'type': 'refresh'
         }
         
@@ -76,6 +82,26 @@ class JWTManager:
             algorithms=['HS256']
         )
 
+    @staticmethod
+    def decode_refresh_token(token: str) -> Dict[str, Any]:
+        """
+        Decode a token and check that it is a refresh token.
+        
+        Args:
+            token: The refresh token to decode
+            
+        Returns:
+            dict: The decoded token payload
+            
+        Raises:
+            jwt.InvalidTokenError: If token is invalid or not a refresh token
+            jwt.ExpiredSignatureError: If token has expired
+        """
+        payload = JWTManager.decode_token(token)
+        if payload.get('type') != 'refresh' or not payload.get('jti'):
+            raise jwt.InvalidTokenError('Not a refresh token')
+        return payload
+
     @staticmethod
     def verify_refresh_token(token: str) -> bool:
         """
@@ -88,7 +114,7 @@ class JWTManager:
             bool: True if token is a valid refresh token
         """
         try:
-            payload = JWTManager.decode_token(token)
-            return payload.get('type') == 'refresh'
+            JWTManager.decode_refresh_token(token)
+            return True
         except jwt.InvalidTokenError:
             return False
@@ -0,0 +1,177 @@
+import cProfile
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import time
+from datetime import datetime, timezone
+from flask import g, request, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROFILE_HEADER = 'X-Profile-Signature'
+CAPTURE_ID_HEADER = 'X-Profile-Capture'
+
+_listeners_installed = False
+
+def sign_profile_request(secret_key: str, method: str, path: str, ttl: int = 300) -> str:
+    """
+    Compute the signature that enables profiling for a single request.
+
+    The signature expires, so a captured header cannot be replayed later.
+
+    Args:
+        secret_key: The application's SECRET_KEY
+        method: HTTP method of the request to profile (e.g. 'GET')
+        path: Request path without query string (e.g. '/my/trips')
+        ttl: Seconds the signature stays valid (at most PROFILE_SIGNATURE_TTL)
+
+    Returns:
+        str: "<expires>:<hex HMAC-SHA256>" to send in the X-Profile-Signature header
+    """
+    expires = int(time.time()) + ttl
+    return f"{expires}:{_signature(secret_key, method, path, expires)}"
+
+def _signature(secret_key: str, method: str, path: str, expires: int) -> str:
+    message = f"{method.upper()} {path} {expires}".encode()
+    return hmac.new(secret_key.encode(), message, hashlib.sha256).hexdigest()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and g.get('_profile_statements') is not None:
+        conn.info.setdefault('_profile_query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_app_context():
+        return
+    statements = g.get('_profile_statements')
+    starts = conn.info.get('_profile_query_start')
+    if statements is None or not starts:
+        return
+    statements.append({
+        'statement': statement,
+        'duration_ms': round((time.perf_counter() - starts.pop()) * 1000, 3),
+        'executemany': executemany
+    })
+
+def _install_sql_listeners():
+    """Record SQL statements for requests that are being captured."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _listeners_installed = True
+
+def _has_valid_signature(app) -> bool:
+    expires, _, signature = request.headers.get(PROFILE_HEADER, '').partition(':')
+    if not expires.isascii() or not expires.isdigit() or not signature:
+        return False
+    # Reject expired signatures and ones valid for longer than allowed
+    now = time.time()
+    if not now <= int(expires) <= now + app.config['PROFILE_SIGNATURE_TTL']:
+        return False
+    expected = _signature(app.config['SECRET_KEY'], request.method, request.path, int(expires))
+    # The header is client input: compare bytes, since compare_digest raises on non-ASCII str
+    return hmac.compare_digest(signature.encode(), expected.encode())
+
+def _rotate_captures(directory: str, max_captures: int) -> None:
+    """Delete the oldest captures so at most max_captures remain."""
+    captures = sorted(name[:-len('.json')] for name in os.listdir(directory) if name.endswith('.json'))
+    for capture_id in captures[:max(len(captures) - max_captures, 0)]:
+        for extension in ('.json', '.prof'):
+            try:
+                os.remove(os.path.join(directory, capture_id + extension))
+            except FileNotFoundError:
+                pass
+
+def _write_capture(app, response, elapsed_ms: float, profiler) -> str:
+    directory = app.config['PROFILE_DIR']
+    os.makedirs(directory, exist_ok=True)
+
+    timestamp = datetime.now(timezone.utc)
+    path_slug = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_') or 'root'
+    capture_id = f"{timestamp.strftime('%Y%m%dT%H%M%S%f')}-{request.method}-{path_slug}-{int(elapsed_ms)}ms"
+
+    if profiler is not None:
+        profiler.dump_stats(os.path.join(directory, capture_id + '.prof'))
+
+    statements = g.get('_profile_statements') or []
+    with open(os.path.join(directory, capture_id + '.json'), 'w') as f:
+        json.dump({
+            'method': request.method,
+            'path': request.path,
+            'query_string': request.query_string.decode(errors='replace'),
+            'status': response.status_code,
+            'elapsed_ms': round(elapsed_ms, 3),
+            'captured_at': timestamp.isoformat(),
+            'reason': 'profiled' if profiler is not None else 'slow',
+            'sql_count': len(statements),
+            'sql_ms': round(sum(s['duration_ms'] for s in statements), 3),
+            'sql': statements
+        }, f, indent=2)
+
+    _rotate_captures(directory, app.config['PROFILE_MAX_CAPTURES'])
+    return capture_id
+
+def init_profiler(app) -> None:
+    """
+    Register request hooks for on-demand profiling and slow-request capture.
+
+    A request is profiled with cProfile when it carries a valid
+    X-Profile-Signature header (PROFILE_HEADER_ENABLED) or is picked by
+    PROFILE_SAMPLE_RATE. Any request slower than PROFILE_SLOW_REQUEST_MS is
+    captured with its timings and SQL statements. Captures are written to
+    PROFILE_DIR, keeping the newest PROFILE_MAX_CAPTURES.
+
+    When all three settings are off no hooks are registered at all.
+    """
+    sample_rate = app.config['PROFILE_SAMPLE_RATE']
+    slow_ms = app.config['PROFILE_SLOW_REQUEST_MS']
+    header_enabled = app.config['PROFILE_HEADER_ENABLED']
+
+    if sample_rate <= 0 and slow_ms <= 0 and not header_enabled:
+        return
+
+    _install_sql_listeners()
+
+    @app.before_request
+    def start_profiling():
+        profile = (header_enabled and _has_valid_signature(app)) or \
+            (sample_rate > 0 and random.random() < sample_rate)
+
+        if not profile and slow_ms <= 0:
+            return
+
+        g._profile_statements = []
+        g._profile_start = time.perf_counter()
+        if profile:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                g._profiler = profiler
+            except ValueError:
+                # Another profiler is already active on this thread
+                app.logger.warning("Skipping request profile: profiler already active")
+
+    @app.after_request
+    def finish_profiling(response):
+        start = g.get('_profile_start')
+        if start is None:
+            return response
+
+        profiler = g.pop('_profiler', None)
+        if profiler is not None:
+            profiler.disable()
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if profiler is not None or elapsed_ms >= slow_ms > 0:
+            try:
+                capture_id = _write_capture(app, response, elapsed_ms, profiler)
+                response.headers[CAPTURE_ID_HEADER] = capture_id
+            except OSError as e:
+                app.logger.error(f"Failed to write profile capture: {str(e)}")
+
+        g._profile_statements = None
+        return response
@@ -0,0 +1,192 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, jsonify, current_app
+
+class InMemoryBucketStore:
+    """
+    Token buckets kept in process memory.
+
+    Buckets live in an LRU ordered dict capped at max_keys, so memory stays
+    bounded no matter how many distinct IPs or usernames are seen. An
+    evicted bucket simply starts over full.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.evictions = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, refill_per_sec: float) -> float:
+        """
+        Take one token from the bucket for key.
+
+        Returns:
+            float: 0 if the token was granted, else seconds until one is available
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_per_sec)
+            if tokens >= 1:
+                retry_after = 0.0
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / refill_per_sec
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        return retry_after
+
+    def size(self) -> int:
+        return len(self._buckets)
+
+class RedisBucketStore:
+    """Token buckets shared between processes through Redis."""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+    local retry = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        retry = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(retry)
+    """
+
+    def __init__(self, url: str):
+        import redis
+        self.evictions = 0
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def consume(self, key: str, capacity: int, refill_per_sec: float) -> float:
+        return float(self._script(keys=[f'ratelimit:{key}'], args=[capacity, refill_per_sec, time.time()]))
+
+    def size(self) -> int:
+        return -1  # Not tracked locally
+
+class RateLimiter:
+    """Per-IP and per-identity token bucket limiter for credential endpoints."""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.store = None
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config['RATELIMIT_ENABLED']
+        self.ip_limits = {
+            'default': (app.config['RATELIMIT_IP_CAPACITY'], app.config['RATELIMIT_IP_REFILL_PER_SEC']),
+            'availability': (app.config['RATELIMIT_AVAILABILITY_CAPACITY'],
+                             app.config['RATELIMIT_AVAILABILITY_REFILL_PER_SEC'])
+        }
+        self.identity_limit = (app.config['RATELIMIT_IDENTITY_CAPACITY'],
+                               app.config['RATELIMIT_IDENTITY_REFILL_PER_SEC'])
+        if app.config['RATELIMIT_STORAGE_URL']:
+            self.store = RedisBucketStore(app.config['RATELIMIT_STORAGE_URL'])
+        else:
+            self.store = InMemoryBucketStore(app.config['RATELIMIT_MAX_KEYS'])
+        app.extensions['rate_limiter'] = self
+
+    def check(self, endpoint: str, ip: str, identities: list, ip_limit: str = 'default') -> float:
+        """
+        Consume a token for the client IP and each identity.
+
+        Args:
+            endpoint: Name of the endpoint being limited
+            ip: Client IP address
+            identities: Normalized usernames/emails taken from the request
+            ip_limit: Name of the per-IP capacity and refill rate to apply
+
+        Returns:
+            float: 0 if the request may proceed, else seconds to wait
+        """
+        buckets = [(f'{endpoint}:ip:{ip}', self.ip_limits[ip_limit])]
+        buckets += [(f'{endpoint}:id:{identity}', self.identity_limit) for identity in identities]
+
+        retry_after = 0.0
+        try:
+            for key, (capacity, refill_per_sec) in buckets:
+                retry_after = self.store.consume(key, capacity, refill_per_sec)
+                if retry_after:
+                    break
+        except Exception as e:
+            # Fail open: a broken shared store must not lock everybody out
+            current_app.logger.error(f"Rate limiter store error: {str(e)}")
+            retry_after = 0.0
+
+        with self._stats_lock:
+            counts = self._stats.setdefault(endpoint, {'allowed': 0, 'rejected': 0})
+            counts['rejected' if retry_after else 'allowed'] += 1
+        return retry_after
+
+    def stats(self) -> dict:
+        """Return allowed/rejected counts per endpoint and store usage."""
+        with self._stats_lock:
+            endpoints = {name: dict(counts) for name, counts in self._stats.items()}
+        return {
+            'enabled': self.enabled,
+            'endpoints': endpoints,
+            'tracked_keys': self.store.size() if self.store else 0,
+            'evictions': self.store.evictions if self.store else 0
+        }
+
+limiter = RateLimiter()
+
+def rate_limited(*identity_fields, ip_limit: str = 'default'):
+    """
+    Decorator to throttle a route per client IP and per identity.
+
+    Runs before the view body, so rejected requests never reach password
+    hashing, the database or SMTP.
+
+    Usage:
+        @users.route('/login', methods=['POST'])
+        @rate_limited('username')
+        def login():
+            ...
+
+    Args:
+        identity_fields: JSON body fields (e.g. 'username', 'email') that get
+            their own bucket in addition to the client IP
+        ip_limit: Per-IP limit to use, 'default' (RATELIMIT_IP_*) or
+            'availability' (RATELIMIT_AVAILABILITY_*, for per-keystroke lookups)
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not limiter.enabled:
+                return f(*args, **kwargs)
+
+            data = request.get_json(silent=True) or {}
+            identities = [
+                f'{field}:{str(data[field]).strip().lower()}'
+                for field in identity_fields
+                if isinstance(data, dict) and data.get(field)
+            ]
+            retry_after = limiter.check(request.endpoint, request.remote_addr or 'unknown', identities, ip_limit)
+            if retry_after:
+                response = jsonify({'error': 'Too many requests. Please try again later.'})
+                response.headers['Retry-After'] = str(math.ceil(retry_after))
+                return response, 429
+
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
@@ -0,0 +1,87 @@
+import multiprocessing
+import click
+from flask import current_app
+from src.models import db
+
+def default_workers() -> int:
+    """Size the worker pool from the CPU count (2 x cores + 1)."""
+    return multiprocessing.cpu_count() * 2 + 1
+
+def build_server(app, options: dict):
+    """
+    Wrap a fully initialized app in a gunicorn prefork server.
+
+    The app is created once in the master process (preload) and workers
+    are forked from it, sharing the imported modules and warmed in-memory
+    indexes copy-on-write.
+
+    Args:
+        app: The Flask application to serve
+        options: gunicorn settings (bind, workers, threads, keepalive, ...)
+
+    Returns:
+        gunicorn.app.base.BaseApplication: Call .run() to start serving
+    """
+    from gunicorn.app.base import BaseApplication
+
+    def post_fork(server, worker):
+        # Forked workers must not reuse the master's pooled DB connections
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+    class PreforkServer(BaseApplication):
+        def load_config(self):
+            for key, value in {**options, 'post_fork': post_fork}.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    return PreforkServer()
+
+@click.command('serve')
+@click.option('--bind', '-b', default=None, help='Address to listen on [default: SERVE_BIND].')
+@click.option('--workers', '-w', type=int, default=None,
+              help='Worker processes [default: SERVE_WORKERS, or 2 x CPU count + 1].')
+@click.option('--threads', type=int, default=None, help='Threads per worker [default: SERVE_THREADS].')
+@click.option('--keepalive', type=int, default=None, help='Seconds to hold idle keep-alive connections.')
+@click.option('--timeout', type=int, default=None, help='Seconds before a silent worker is restarted.')
+@click.option('--max-requests', type=int, default=None,
+              help='Recycle a worker after this many requests (0 disables).')
+def serve_command(bind, workers, threads, keepalive, timeout, max_requests):
+    """Serve the app with preloaded, forked gunicorn workers.
+
+    Send SIGHUP to the master to gracefully replace workers, SIGTERM for a
+    graceful shutdown.
+    """
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        raise click.ClickException(
+            'gunicorn is required for serve (it does not run on Windows); use "flask run" for development.'
+        )
+
+    app = current_app._get_current_object()
+    config = app.config
+    options = {
+        'bind': bind or config['SERVE_BIND'],
+        'workers': workers or config['SERVE_WORKERS'] or default_workers(),
+        'threads': threads or config['SERVE_THREADS'],
+        'keepalive': keepalive if keepalive is not None else config['SERVE_KEEPALIVE'],
+        'timeout': timeout or config['SERVE_TIMEOUT'],
+        'graceful_timeout': config['SERVE_GRACEFUL_TIMEOUT'],
+        'max_requests': max_requests if max_requests is not None else config['SERVE_MAX_REQUESTS'],
+        'max_requests_jitter': config['SERVE_MAX_REQUESTS_JITTER'],
+        'preload_app': True
+    }
+    if options['threads'] > 1:
+        options['worker_class'] = 'gthread'
+
+    click.echo(f"Serving on {options['bind']} with {options['workers']} workers "
+               f"x {options['threads']} threads")
+    build_server(app, options).run()
+
+def register_commands(app):
+    """Register server commands."""
+    app.cli.add_command(serve_command)
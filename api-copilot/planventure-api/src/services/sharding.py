@@ -0,0 +1,427 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+import sqlalchemy as sa
+from flask import current_app
+from src.models import db, User, Trip, UserDirectory, IdSequence, ShardLayout
+from src.models.shard_router import SHARDED_TABLES, shard_bind_key
+
+# Column holding the owning user's id, which picks the shard, per sharded table.
+# Listed parents first so copies satisfy foreign keys.
+OWNER_COLUMNS = {
+    'user': 'id',
+    'trip': 'user_id',
+    'revoked_token': 'user_id',
+    'trip_deletion': 'user_id',
+    'trip_change_counter': 'user_id',
+    'user_trip_stats': 'user_id'
+}
+
+def parse_shard_urls(value) -> list:
+    """Split SHARD_DATABASE_URLS (comma separated or a list) into URLs."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [url.strip() for url in value if url.strip()]
+
+def init_sharding(app) -> None:
+    """
+    Register one SQLALCHEMY_BINDS entry per shard in SHARD_DATABASE_URLS.
+
+    Must run before db.init_app so Flask-SQLAlchemy creates the shard
+    engines. With no shard URLs every table stays in SQLALCHEMY_DATABASE_URI.
+    """
+    urls = parse_shard_urls(app.config.get('SHARD_DATABASE_URLS'))
+    app.config['SHARD_COUNT'] = len(urls)
+    if urls:
+        app.config['SQLALCHEMY_BINDS'] = {
+            **(app.config.get('SQLALCHEMY_BINDS') or {}),
+            **{shard_bind_key(shard): url for shard, url in enumerate(urls)}
+        }
+    app.extensions['sharding'] = {
+        'resharded_at': None,
+        'trip_ids': IdBlockAllocator('trip')
+    }
+
+def sharding_enabled() -> bool:
+    return current_app.config.get('SHARD_COUNT', 0) > 0
+
+def shard_count() -> int:
+    return current_app.config.get('SHARD_COUNT', 0)
+
+def shard_for(user_id: int, count: int = None) -> int:
+    """Shard holding a user's rows."""
+    return user_id % (count or shard_count())
+
+def select_shard(shard) -> None:
+    """
+    Point the current session at a shard (None to clear it).
+
+    Pending changes are flushed to the previous shard first, so a session
+    can move between shards as long as each object is changed while its
+    own shard is selected.
+    """
+    session = db.session
+    current = session.info.get('shard')
+    if current == shard:
+        return
+    if current is not None:
+        session.flush()
+    session.info['shard'] = shard
+
+def select_user_shard(user_id: int) -> None:
+    """Point the current session at the shard holding user_id."""
+    if sharding_enabled():
+        select_shard(shard_for(user_id))
+
+def each_shard():
+    """
+    Point the session at every shard in turn.
+
+    Yields each shard number, or None once when sharding is off, and
+    restores the previously selected shard afterwards.
+    """
+    if not sharding_enabled():
+        yield None
+        return
+    previous = db.session.info.get('shard')
+    try:
+        for shard in range(shard_count()):
+            select_shard(shard)
+            yield shard
+    finally:
+        select_shard(previous)
+
+def find_on_any_shard(lookup):
+    """
+    Scatter a lookup over the shards until one returns a result.
+
+    The matching shard stays selected so the result can be modified and
+    committed. Only for lookups by values that do not identify the user,
+    such as emailed tokens.
+
+    Args:
+        lookup: Callable running the query on the selected shard
+
+    Returns:
+        The first non-None result, or None
+    """
+    if not sharding_enabled():
+        return lookup()
+    for shard in range(shard_count()):
+        select_shard(shard)
+        result = lookup()
+        if result is not None:
+            return result
+    return None
+
+def sync_id_sequence(connection, table: sa.Table) -> None:
+    """
+    Move a PostgreSQL serial sequence past ids that were inserted explicitly.
+
+    Bulk seeding and resharding write user ids themselves, which leaves the
+    sequence behind and makes the next INSERT collide. Other databases
+    derive the next id from the table, so this is a no-op there.
+
+    Args:
+        connection: Connection to the database holding the table
+        table: Table with an integer serial 'id' column
+    """
+    dialect = connection.dialect
+    if dialect.name != 'postgresql':
+        return
+    sequence = sa.func.pg_get_serial_sequence(dialect.identifier_preparer.format_table(table), 'id')
+    connection.execute(sa.select(sa.func.setval(sequence, sa.func.coalesce(sa.func.max(table.c.id), 0) + 1, False)))
+
+def user_directory():
+    """The model holding every username and email: UserDirectory when sharded, else User."""
+    return UserDirectory if sharding_enabled() else User
+
+def find_user(**criteria):
+    """
+    Look up a user by username or email.
+
+    With sharding the directory resolves the user's id, which names the
+    shard, so the lookup touches the main database and exactly one shard.
+
+    Args:
+        **criteria: username= or email=
+
+    Returns:
+        User: The matching user (its shard selected), or None
+    """
+    if not sharding_enabled():
+        return User.query.filter_by(**criteria).first()
+    user_id = db.session.query(UserDirectory.id).filter_by(**criteria).scalar()
+    if user_id is None:
+        return None
+    select_user_shard(user_id)
+    return db.session.get(User, user_id)
+
+def add_user(user) -> None:
+    """
+    Add a new user to the session.
+
+    With sharding the username and email are claimed in the directory
+    first, which assigns the user's global id and selects its shard.
+
+    Raises:
+        sqlalchemy.exc.IntegrityError: If the username or email is taken
+            (raised here when sharded, otherwise on commit)
+    """
+    if sharding_enabled():
+        entry = UserDirectory(username=user.username, email=user.email)
+        db.session.add(entry)
+        db.session.flush()
+        user.id = entry.id
+        select_user_shard(user.id)
+    db.session.add(user)
+
+def delete_users(ids: list) -> None:
+    """Delete users on the selected shard and release their directory entries."""
+    User.query.filter(User.id.in_(ids)).delete(synchronize_session=False)
+    if sharding_enabled():
+        UserDirectory.query.filter(UserDirectory.id.in_(ids)).delete(synchronize_session=False)
+
+def insert_rows(table, rows: list, statement=None) -> None:
+    """
+    Bulk insert rows of a sharded table, each on its owner's shard.
+
+    Args:
+        table: The sharded Table
+        rows: Row dicts, each containing the table's owner column
+        statement: Insert statement to use instead of table.insert()
+    """
+    statement = table.insert() if statement is None else statement
+    if not sharding_enabled():
+        db.session.execute(statement, rows)
+        return
+    owner = OWNER_COLUMNS[table.name]
+    by_shard = defaultdict(list)
+    for row in rows:
+        by_shard[shard_for(row[owner])].append(row)
+    for shard, shard_rows in sorted(by_shard.items()):
+        select_shard(shard)
+        db.session.execute(statement, shard_rows)
+
+def allocate_ids(name: str, count: int) -> int:
+    """
+    Reserve count consecutive ids from a sequence in the main database.
+
+    Runs in its own short transaction so reservations are never rolled
+    back with the caller's work. On SQLite, call it before writing to the
+    main database in the same session, or the two connections deadlock.
+
+    Returns:
+        int: The first reserved id
+    """
+    with db.engine.begin() as connection:
+        updated = connection.execute(
+            sa.update(IdSequence).where(IdSequence.name == name)
+            .values(next_id=IdSequence.next_id + count)
+        )
+        if not updated.rowcount:
+            raise RuntimeError(f"Id sequence '{name}' is not initialized")
+        return connection.execute(
+            sa.select(IdSequence.next_id).where(IdSequence.name == name)
+        ).scalar_one() - count
+
+class IdBlockAllocator:
+    """
+    Hands out ids from blocks reserved with allocate_ids (hi/lo).
+
+    One write to the main database serves SHARD_ID_BLOCK_SIZE inserts.
+    Ids are unique across shards but not ordered across processes. A
+    forked worker reserves its own block instead of reusing its parent's.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._next = self._end = 0
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            if self._pid != os.getpid() or self._next >= self._end:
+                block_size = current_app.config['SHARD_ID_BLOCK_SIZE']
+                self._next = allocate_ids(self.name, block_size)
+                self._end = self._next + block_size
+                self._pid = os.getpid()
+            value = self._next
+            self._next += 1
+            return value
+
+@sa.event.listens_for(Trip, 'before_insert')
+def assign_trip_id(mapper, connection, trip):
+    # Per-shard autoincrement would reuse ids, which resharding cannot merge
+    if trip.id is None and sharding_enabled():
+        trip.id = current_app.extensions['sharding']['trip_ids'].next_id()
+
+def resharded_at():
+    """When the data was last resharded (naive UTC), or None."""
+    return current_app.extensions['sharding']['resharded_at']
+
+def _sharded_tables() -> list:
+    return [db.metadata.tables[name] for name in OWNER_COLUMNS]
+
+def _main_tables() -> list:
+    return [table for name, table in db.metadata.tables.items() if name not in SHARDED_TABLES]
+
+def _max_id(engine, table) -> int:
+    with engine.connect() as connection:
+        return connection.execute(sa.select(sa.func.max(table.c.id))).scalar() or 0
+
+def create_tables(app) -> None:
+    """
+    Create missing tables and check the shard layout.
+
+    Unsharded, this is db.create_all(). Sharded, the directory tables go
+    to the main database and user-owned tables to every shard.
+
+    Raises:
+        RuntimeError: If SHARD_DATABASE_URLS does not match how the data is
+            partitioned; run `flask reshard` with the old settings first
+    """
+    with app.app_context():
+        if not sharding_enabled():
+            db.create_all()
+            layout = db.session.get(ShardLayout, 1)
+            if layout is not None:
+                raise RuntimeError(f"Data is sharded across {layout.shard_count} databases; "
+                                   "set SHARD_DATABASE_URLS")
+            return
+
+        db.metadata.create_all(db.engine, tables=_main_tables())
+        shard_engines = [db.engines[shard_bind_key(shard)] for shard in range(shard_count())]
+        for engine in shard_engines:
+            db.metadata.create_all(engine, tables=_sharded_tables())
+
+        layout = db.session.get(ShardLayout, 1)
+        if layout is None:
+            main = sa.inspect(db.engine)
+            if main.has_table('user') and _max_id(db.engine, User.__table__):
+                raise RuntimeError("The main database holds unsharded users; move them with "
+                                   "`flask reshard --to ...` before setting SHARD_DATABASE_URLS")
+            layout = ShardLayout(id=1, shard_count=shard_count())
+            db.session.add(layout)
+        elif layout.shard_count != shard_count():
+            raise RuntimeError(f"Data is sharded across {layout.shard_count} databases but "
+                               f"SHARD_DATABASE_URLS lists {shard_count()}; use `flask reshard`")
+
+        if db.session.get(IdSequence, 'trip') is None:
+            next_id = max(_max_id(engine, Trip.__table__) for engine in shard_engines) + 1
+            db.session.add(IdSequence(name='trip', next_id=next_id))
+        db.session.commit()
+        app.extensions['sharding']['resharded_at'] = layout.resharded_at
+
+def drop_tables() -> None:
+    """Drop every table, on the main database and each shard."""
+    if not sharding_enabled():
+        db.drop_all()
+        return
+    db.metadata.drop_all(db.engine, tables=_main_tables())
+    for shard in range(shard_count()):
+        db.metadata.drop_all(db.engines[shard_bind_key(shard)], tables=_sharded_tables())
+
+def _target_engine(app, url: str):
+    """Create an engine for url, resolving relative SQLite paths like Flask-SQLAlchemy."""
+    url = sa.engine.make_url(url)
+    if url.drivername.startswith('sqlite') and url.database not in (None, '', ':memory:') \
+            and not os.path.isabs(url.database):
+        os.makedirs(app.instance_path, exist_ok=True)
+        url = url.set(database=os.path.join(app.instance_path, url.database))
+    return sa.create_engine(url)
+
+def reshard(app, target_urls: list, batch_size: int = 5000) -> dict:
+    """
+    Copy all user-owned rows to a new set of shard databases.
+
+    Reads from the current layout (the shards, or the main database when
+    unsharded) and writes each row to target shard user_id % len(targets).
+    Sources are left untouched. The directory, trip id sequence and shard
+    layout in the main database are updated so the app starts once
+    SHARD_DATABASE_URLS lists the targets. Run while the API is stopped.
+
+    Trip tombstones are renumbered on their new shard and change feed
+    cursors issued before the reshard are rejected, so clients resync.
+
+    Args:
+        app: The Flask application, configured with the current layout
+        target_urls: Database URLs of the new shards, in shard order
+        batch_size: Rows read and written per batch
+
+    Returns:
+        dict: Rows copied per table and elapsed seconds
+
+    Raises:
+        ValueError: If a target is a current database or already holds users
+    """
+    started = time.perf_counter()
+    count = len(target_urls)
+    if not count:
+        raise ValueError('At least one target database is required')
+
+    sources = ([db.engines[shard_bind_key(shard)] for shard in range(shard_count())]
+               if sharding_enabled() else [db.engine])
+    targets = [_target_engine(app, url) for url in target_urls]
+    source_urls = {str(engine.url) for engine in sources} | {str(db.engine.url)}
+    for target in targets:
+        if str(target.url) in source_urls:
+            raise ValueError(f'Target {target.url} is already in use')
+        db.metadata.create_all(target, tables=_sharded_tables())
+        if _max_id(target, User.__table__):
+            raise ValueError(f'Target {target.url} already holds users')
+
+    fill_directory = not sharding_enabled()
+    if fill_directory:
+        db.metadata.create_all(db.engine, tables=_main_tables())
+        with db.engine.begin() as connection:
+            connection.execute(sa.delete(UserDirectory))
+
+    copied, max_trip_id = {}, 0
+    for table in _sharded_tables():
+        owner = OWNER_COLUMNS[table.name]
+        copied[table.name] = 0
+        for source in sources:
+            with source.connect() as connection:
+                result = connection.execution_options(yield_per=batch_size) \
+                    .execute(sa.select(table).order_by(*table.primary_key))
+                for partition in result.partitions():
+                    by_shard = defaultdict(list)
+                    for row in partition:
+                        values = dict(row._mapping)
+                        if table.name == 'trip_deletion':
+                            values.pop('id')
+                        elif table.name == 'trip':
+                            max_trip_id = max(max_trip_id, values['id'])
+                        by_shard[values[owner] % count].append(values)
+                    for shard, rows in by_shard.items():
+                        with targets[shard].begin() as target:
+                            target.execute(table.insert(), rows)
+                    if fill_directory and table.name == 'user':
+                        with db.engine.begin() as main:
+                            main.execute(sa.insert(UserDirectory), [
+                                {'id': row.id, 'username': row.username, 'email': row.email,
+                                 'created_at': row.created_at} for row in partition
+                            ])
+                    copied[table.name] += len(partition)
+
+    with db.engine.begin() as connection:
+        next_id = connection.execute(
+            sa.select(IdSequence.next_id).where(IdSequence.name == 'trip')).scalar() or 1
+        connection.execute(sa.delete(IdSequence).where(IdSequence.name == 'trip'))
+        connection.execute(sa.insert(IdSequence).values(name='trip', next_id=max(next_id, max_trip_id + 1)))
+        if fill_directory:
+            sync_id_sequence(connection, UserDirectory.__table__)
+        connection.execute(sa.delete(ShardLayout))
+        connection.execute(sa.insert(ShardLayout).values(
+            id=1, shard_count=count, resharded_at=datetime.now(timezone.utc)))
+
+    for target in targets:
+        target.dispose()
+    copied['elapsed_s'] = round(time.perf_counter() - started, 3)
+    return copied
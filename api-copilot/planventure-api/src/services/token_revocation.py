@@ -0,0 +1,91 @@
+import threading
+from datetime import datetime, timezone
+from src.models import db, RevokedToken
+from src.services.bloom import BloomFilter
+from src.services.sharding import each_shard
+
+class RevocationList:
+    """
+    Revoked refresh token ids, checked through an in-memory Bloom filter.
+
+    The RevokedToken table is the source of truth. The filter answers the
+    common "not revoked" case without a database round-trip; only filter
+    hits are confirmed against the table. Each process keeps its own
+    filter, so a token revoked by another process may pass the filter, but
+    rotation still fails on the table's primary key.
+    """
+
+    def __init__(self):
+        self._filter = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.capacity = app.config['REVOCATION_FILTER_CAPACITY']
+        self.error_rate = app.config['REVOCATION_FILTER_ERROR_RATE']
+        app.extensions['revocation_list'] = self
+        with app.app_context():
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        """Reload the filter from the unexpired rows of the RevokedToken table on every shard."""
+        now = datetime.now(timezone.utc)
+
+        def live():
+            return db.session.query(RevokedToken.jti).filter(RevokedToken.expires_at > now)
+
+        live_count = sum(live().count() for _ in each_shard())
+        bloom = BloomFilter(max(self.capacity, live_count * 2), self.error_rate)
+        for _ in each_shard():
+            for (jti,) in live().yield_per(10000):
+                bloom.add(jti)
+        with self._lock:
+            self._filter = bloom
+
+    def is_revoked(self, jti: str) -> bool:
+        """Check whether a refresh token id has been revoked."""
+        if self._filter is not None and jti not in self._filter:
+            return False
+        return db.session.get(RevokedToken, jti) is not None
+
+    def revoke(self, jti: str, user_id: int, expires_at: datetime) -> None:
+        """
+        Stage a revocation in the current session.
+
+        Flushes immediately, so revoking an already revoked token raises
+        sqlalchemy.exc.IntegrityError. Call remember() after committing.
+        """
+        db.session.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+        db.session.flush()
+
+    def remember(self, jti: str) -> None:
+        """Add a committed revocation to this process's filter."""
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def sweep_expired(self, batch_size: int = 1000) -> int:
+        """
+        Delete expired revocations in batches, committing after each batch.
+
+        Expired tokens are rejected by signature validation anyway, so their
+        rows are no longer needed. The filter is rebuilt afterwards.
+
+        Returns:
+            int: Number of rows deleted
+        """
+        now = datetime.now(timezone.utc)
+        deleted = 0
+        for _ in each_shard():
+            while True:
+                jtis = [jti for (jti,) in db.session.query(RevokedToken.jti)
+                        .filter(RevokedToken.expires_at <= now).limit(batch_size)]
+                if not jtis:
+                    break
+                db.session.query(RevokedToken).filter(RevokedToken.jti.in_(jtis)) \
+                    .delete(synchronize_session=False)
+                db.session.commit()
+                deleted += len(jtis)
+        self.rebuild()
+        return deleted
+
+revocation_list = RevocationList()
@@ -0,0 +1,133 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_
+from src.models import db, User, Trip
+from src.services.token_revocation import revocation_list
+from src.services.trip_changes import sweep_trip_deletions
+from src.services.sharding import each_shard, delete_users
+
+def _sweep_in_batches(condition, apply, batch_size: int) -> int:
+    """
+    Apply a change to matching users, batch_size rows per transaction.
+
+    Walks the user table in primary key order so each batch resumes where
+    the previous one stopped instead of rescanning swept rows, and commits
+    after every batch to keep lock time short. Works on the selected shard.
+
+    Args:
+        condition: SQLAlchemy filter selecting the users to sweep
+        apply: Callable taking a list of user ids and issuing the UPDATE/DELETE
+        batch_size: Maximum rows per transaction
+
+    Returns:
+        int: Number of rows swept
+    """
+    swept, last_id = 0, 0
+    while True:
+        ids = [user_id for (user_id,) in db.session.query(User.id)
+               .filter(condition, User.id > last_id)
+               .order_by(User.id)
+               .limit(batch_size)]
+        if not ids:
+            break
+        apply(ids)
+        db.session.commit()
+        swept += len(ids)
+        last_id = ids[-1]
+    return swept
+
+def sweep_verification_tokens(batch_size: int, timeout: int) -> int:
+    """Clear email verification tokens older than timeout seconds."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=timeout)
+    return _sweep_in_batches(
+        and_(User.email_verification_token.isnot(None), User.email_verification_sent_at < cutoff),
+        lambda ids: User.query.filter(User.id.in_(ids))
+            .update({User.email_verification_token: None}, synchronize_session=False),
+        batch_size
+    )
+
+def sweep_reset_tokens(batch_size: int) -> int:
+    """Clear password reset tokens that have expired."""
+    now = datetime.now(timezone.utc)
+    return _sweep_in_batches(
+        and_(User.reset_token_hash.isnot(None), User.reset_token_expires < now),
+        lambda ids: User.query.filter(User.id.in_(ids))
+            .update({User.reset_token_hash: None, User.reset_token_expires: None}, synchronize_session=False),
+        batch_size
+    )
+
+def sweep_unverified_users(batch_size: int, max_age: int) -> int:
+    """
+    Delete accounts that never verified their email within max_age seconds.
+
+    Only users who registered through email verification, never logged in
+    and own no trips are removed, along with their directory entries.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+    return _sweep_in_batches(
+        and_(
+            User.email_verified.is_(False),
+            User.email_verification_sent_at < cutoff,
+            User.last_login.is_(None),
+            ~Trip.query.filter(Trip.user_id == User.id).exists()
+        ),
+        delete_users,
+        batch_size
+    )
+
+def sweep_tokens(app, batch_size: int = None) -> dict:
+    """
+    Run every sweep on every shard and report how much was removed.
+
+    Args:
+        app: The Flask application (an app context must be active)
+        batch_size: Rows per transaction, defaults to TOKEN_SWEEP_BATCH_SIZE
+
+    Returns:
+        dict: Rows swept per category, total, elapsed seconds and rows/s
+    """
+    batch_size = batch_size or app.config['TOKEN_SWEEP_BATCH_SIZE']
+    started = time.perf_counter()
+    results = dict.fromkeys(['unverified_users', 'verification_tokens', 'reset_tokens', 'trip_tombstones'], 0)
+    for _ in each_shard():
+        results['unverified_users'] += sweep_unverified_users(batch_size, app.config['UNVERIFIED_USER_TTL'])
+        results['verification_tokens'] += sweep_verification_tokens(batch_size, app.config['EMAIL_VERIFICATION_TIMEOUT'])
+        results['reset_tokens'] += sweep_reset_tokens(batch_size)
+        results['trip_tombstones'] += sweep_trip_deletions(batch_size, app.config['TRIP_DELETION_RETENTION'])
+    results['revoked_refresh_tokens'] = revocation_list.sweep_expired(batch_size)
+    elapsed = time.perf_counter() - started
+    results['total'] = sum(results.values())
+    results['elapsed_s'] = round(elapsed, 3)
+    results['rows_per_s'] = round(results['total'] / elapsed, 1) if elapsed else 0.0
+    return results
+
+def start_sweeper(app) -> threading.Thread:
+    """
+    Run sweep_tokens every TOKEN_SWEEP_INTERVAL seconds in a daemon thread.
+
+    Returns:
+        threading.Thread: The started thread, or None when the interval is 0
+    """
+    interval = app.config['TOKEN_SWEEP_INTERVAL']
+    if interval <= 0:
+        return None
+
+    def run():
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    results = sweep_tokens(app)
+                    if results['total']:
+                        app.logger.info(f"Token sweep removed {results['total']} rows "
+                                        f"({results['rows_per_s']} rows/s)")
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.error(f"Token sweep failed: {str(e)}")
+                finally:
+                    db.session.remove()
+
+    thread = threading.Thread(target=run, name='token-sweeper', daemon=True)
+    thread.start()
+    return thread
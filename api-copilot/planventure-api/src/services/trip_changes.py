@@ -0,0 +1,176 @@
+import base64
+import json
+import time
+from datetime import datetime, timedelta, timezone
+import sqlalchemy as sa
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from src.models import db, Trip, TripDeletion, TripChangeCounter
+from src.services.sharding import resharded_at
+
+class CursorExpiredError(Exception):
+    """The cursor predates the retained deletion log; the client must resync."""
+
+def next_change_seq(connection, user_id: int) -> int:
+    """
+    Bump and return a user's change counter inside the current transaction.
+
+    The UPDATE keeps the counter row locked until commit, so a user's
+    changes become visible in sequence order: once a reader sees number N,
+    every change numbered below N has committed too. Unlike a timestamp
+    taken before the write lock, a later number can never commit first.
+
+    Args:
+        connection: The flush's connection to the user's database
+        user_id: Owner of the changed trip
+    """
+    counter = TripChangeCounter.__table__
+    bump = sa.update(counter).where(counter.c.user_id == user_id).values(last_seq=counter.c.last_seq + 1)
+    if not connection.execute(bump).rowcount:
+        try:
+            with connection.begin_nested():
+                connection.execute(sa.insert(counter).values(user_id=user_id, last_seq=1))
+            return 1
+        except IntegrityError:
+            # Another transaction created the counter first
+            connection.execute(bump)
+    return connection.execute(
+        sa.select(counter.c.last_seq).where(counter.c.user_id == user_id)
+    ).scalar_one()
+
+@sa.event.listens_for(Trip, 'before_insert')
+@sa.event.listens_for(Trip, 'before_update')
+def stamp_trip_change(mapper, connection, trip):
+    if trip.id is None or sa.orm.object_session(trip).is_modified(trip, include_collections=False):
+        trip.change_seq = next_change_seq(connection, trip.user_id)
+
+@sa.event.listens_for(TripDeletion, 'before_insert')
+def stamp_trip_deletion(mapper, connection, deletion):
+    deletion.change_seq = next_change_seq(connection, deletion.user_id)
+
+def encode_cursor(change_seq: int, trip_id: int, deleted_after: int) -> str:
+    """
+    Encode a change feed position as an opaque URL-safe string.
+
+    Args:
+        change_seq: change_seq of the last change the client has seen
+        trip_id: id of that trip, to break ties between never-changed trips
+            (change_seq 0)
+        deleted_after: Tombstones at or below this sequence number are not
+            returned (set when a full sync starts)
+
+    Returns:
+        str: The cursor to pass back as ?since=
+    """
+    payload = {
+        's': change_seq,
+        'i': trip_id,
+        'd': deleted_after,
+        't': int(time.time())
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+        CursorExpiredError: If the cursor uses the old timestamp format
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if 's' not in payload and 'u' in payload:
+            raise CursorExpiredError()
+        return {
+            'change_seq': int(payload['s']),
+            'trip_id': int(payload['i']),
+            'deleted_after': int(payload['d']),
+            'issued_at': int(payload['t'])
+        }
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+def get_changes(user_id: int, since: str, limit: int, retention: int) -> dict:
+    """
+    Return trips created or updated, and trips deleted, after a cursor.
+
+    Every trip write and tombstone carries a per-user change sequence
+    number assigned under a lock in its own transaction (next_change_seq).
+    Trips and tombstones are read by keyset scans on (user_id, change_seq)
+    and merged in sequence order, so the cost depends on the number of
+    changes rather than the size of the collection. Without a cursor the
+    whole collection is returned page by page and past deletions are
+    skipped.
+
+    Args:
+        user_id: Owner of the trips
+        since: Cursor from a previous call, or None for a full sync
+        limit: Maximum changes (trips plus tombstones) per page
+        retention: Seconds tombstones are kept; older cursors are rejected
+
+    Returns:
+        dict: trips, deleted, the next cursor and whether more changes remain
+
+    Raises:
+        ValueError: If the cursor is malformed
+        CursorExpiredError: If the cursor is older than the tombstone retention
+            or than the last reshard
+    """
+    if since:
+        position = decode_cursor(since)
+        if position['issued_at'] < time.time() - retention:
+            raise CursorExpiredError()
+        resharded = resharded_at()
+        if resharded and position['issued_at'] < resharded.replace(tzinfo=timezone.utc).timestamp():
+            raise CursorExpiredError()
+    else:
+        counter = db.session.get(TripChangeCounter, user_id)
+        position = {'change_seq': 0, 'trip_id': 0, 'deleted_after': counter.last_seq if counter else 0}
+
+    change_seq, trip_id = position['change_seq'], position['trip_id']
+    trips = Trip.query.filter(
+        Trip.user_id == user_id,
+        or_(Trip.change_seq > change_seq, and_(Trip.change_seq == change_seq, Trip.id > trip_id))
+    ).order_by(Trip.change_seq, Trip.id).limit(limit + 1).all()
+
+    deletions = TripDeletion.query.filter(
+        TripDeletion.user_id == user_id,
+        TripDeletion.change_seq > max(change_seq, position['deleted_after'])
+    ).order_by(TripDeletion.change_seq).limit(limit + 1).all()
+
+    changes = sorted(trips + deletions, key=lambda change: (change.change_seq, getattr(change, 'trip_id', change.id)))
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    if changes:
+        last = changes[-1]
+        change_seq = last.change_seq
+        trip_id = last.id if isinstance(last, Trip) else 0
+
+    return {
+        'trips': [change.to_dict() for change in changes if isinstance(change, Trip)],
+        'deleted': [change.to_dict() for change in changes if isinstance(change, TripDeletion)],
+        'cursor': encode_cursor(change_seq, trip_id, position['deleted_after']),
+        'has_more': has_more
+    }
+
+def sweep_trip_deletions(batch_size: int, retention: int) -> int:
+    """
+    Delete tombstones older than retention seconds, one batch per commit.
+
+    Returns:
+        int: Number of tombstones deleted
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=retention)
+    deleted = 0
+    while True:
+        ids = [deletion_id for (deletion_id,) in db.session.query(TripDeletion.id)
+               .filter(TripDeletion.deleted_at < cutoff)
+               .order_by(TripDeletion.id).limit(batch_size)]
+        if not ids:
+            break
+        TripDeletion.query.filter(TripDeletion.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += len(ids)
+    return deleted
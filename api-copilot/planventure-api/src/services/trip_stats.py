@@ -0,0 +1,124 @@
+from src.models import db, Trip, UserTripStats
+from src.services.sharding import each_shard
+
+def trip_contribution(trip) -> dict:
+    """
+    What a single trip adds to its owner's statistics.
+
+    Returns:
+        dict: year, days (inclusive of both ends) and destination
+    """
+    return {
+        'year': str(trip.start_date.year),
+        'days': (trip.end_date.date() - trip.start_date.date()).days + 1,
+        'destination': trip.destination
+    }
+
+def _adjust(counts: dict, key: str, delta: int) -> dict:
+    counts = dict(counts)
+    value = counts.get(key, 0) + delta
+    if value > 0:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+    return counts
+
+def record_trip_change(user_id: int, before: dict = None, after: dict = None) -> None:
+    """
+    Apply a trip insert, update or delete to the owner's statistics.
+
+    Runs in the caller's transaction, so the summary commits or rolls back
+    together with the trip itself. The stats row is locked for update
+    where the database supports it. A user without a row starts from zero,
+    so trips written before the table existed only count after
+    `flask rebuild-stats`.
+
+    Args:
+        user_id: Owner of the trip
+        before: trip_contribution() before the change, None for an insert
+        after: trip_contribution() after the change, None for a delete
+    """
+    if before == after:
+        return
+
+    stats = UserTripStats.query.filter_by(user_id=user_id).with_for_update().first()
+    if stats is None:
+        stats = UserTripStats(user_id=user_id, trip_count=0, total_days=0,
+                              trips_per_year={}, destination_counts={})
+        db.session.add(stats)
+
+    trips_per_year, destination_counts = stats.trips_per_year, stats.destination_counts
+    for contribution, sign in ((before, -1), (after, 1)):
+        if contribution is None:
+            continue
+        stats.trip_count += sign
+        stats.total_days += sign * contribution['days']
+        trips_per_year = _adjust(trips_per_year, contribution['year'], sign)
+        destination_counts = _adjust(destination_counts, contribution['destination'], sign)
+
+    # Assign new dicts so the JSON columns are flagged as changed
+    stats.trips_per_year = trips_per_year
+    stats.destination_counts = destination_counts
+
+def rebuild_stats(batch_size: int = 1000) -> int:
+    """
+    Recompute every user's statistics from the trip table, on every shard.
+
+    Users are walked by keyset on user_id, batch_size users at a time. Each
+    batch replaces the summaries in its user_id range in one transaction,
+    so the table is never left empty and the trip reads and summary writes
+    share one connection.
+
+    Run it once after deploying the stats table, and whenever summaries
+    have drifted, with trip writes stopped: until it has run,
+    record_trip_change counts existing users from zero, and a trip written
+    during the rebuild can collide with the batch's inserts.
+
+    Returns:
+        int: Number of users with statistics
+    """
+    return sum(_rebuild_shard_stats(batch_size) for _ in each_shard())
+
+def _rebuild_shard_stats(batch_size: int) -> int:
+    users, last_user_id = 0, None
+    while True:
+        user_ids = db.session.query(Trip.user_id).distinct()
+        if last_user_id is not None:
+            user_ids = user_ids.filter(Trip.user_id > last_user_id)
+        user_ids = [user_id for (user_id,) in user_ids.order_by(Trip.user_id).limit(batch_size)]
+        if not user_ids:
+            break
+
+        summaries = {}
+        rows = db.session.query(Trip.user_id, Trip.start_date, Trip.end_date, Trip.destination) \
+            .filter(Trip.user_id.between(user_ids[0], user_ids[-1]))
+        for user_id, start_date, end_date, destination in rows:
+            summary = summaries.setdefault(user_id, {
+                'user_id': user_id, 'trip_count': 0, 'total_days': 0,
+                'trips_per_year': {}, 'destination_counts': {}
+            })
+            year = str(start_date.year)
+            summary['trip_count'] += 1
+            summary['total_days'] += (end_date.date() - start_date.date()).days + 1
+            summary['trips_per_year'][year] = summary['trips_per_year'].get(year, 0) + 1
+            summary['destination_counts'][destination] = summary['destination_counts'].get(destination, 0) + 1
+
+        # Replace the whole range, which also drops summaries of users left without trips
+        _delete_stats(last_user_id, user_ids[-1])
+        db.session.execute(UserTripStats.__table__.insert(), list(summaries.values()))
+        db.session.commit()
+        users += len(summaries)
+        last_user_id = user_ids[-1]
+
+    _delete_stats(last_user_id, None)
+    db.session.commit()
+    return users
+
+def _delete_stats(after_user_id, through_user_id) -> None:
+    """Delete summaries with after_user_id < user_id <= through_user_id (None = unbounded)."""
+    query = UserTripStats.query
+    if after_user_id is not None:
+        query = query.filter(UserTripStats.user_id > after_user_id)
+    if through_user_id is not None:
+        query = query.filter(UserTripStats.user_id <= through_user_id)
+    query.delete(synchronize_session=False)
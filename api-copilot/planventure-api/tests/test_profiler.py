@@ -0,0 +1,32 @@
+import time
+import pytest
+from app import create_app
+from src.config import Config
+from src.services.profiler import PROFILE_HEADER, CAPTURE_ID_HEADER, sign_profile_request
+
+@pytest.fixture
+def client(tmp_path):
+    class ProfilerTestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        SHARD_DATABASE_URLS = ''
+        RATELIMIT_ENABLED = False
+        PROFILE_SAMPLE_RATE = 0.0
+        PROFILE_SLOW_REQUEST_MS = 0
+        PROFILE_HEADER_ENABLED = True
+        PROFILE_DIR = str(tmp_path / 'profiles')
+    return create_app(ProfilerTestConfig).test_client()
+
+def test_valid_signature_profiles_request(client):
+    signature = sign_profile_request(client.application.config['SECRET_KEY'], 'GET', '/health')
+    response = client.get('/health', headers={PROFILE_HEADER: signature})
+    assert response.status_code == 200
+    assert response.headers.get(CAPTURE_ID_HEADER)
+
+@pytest.mark.parametrize('signature', ['éabc', '²' * 64, 'zz'])
+def test_invalid_signature_is_ignored(client, signature):
+    header = f'{int(time.time()) + 60}:{signature}'
+    response = client.get('/health', headers={PROFILE_HEADER: header})
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'healthy'}
+    assert CAPTURE_ID_HEADER not in response.headers